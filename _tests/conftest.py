@@ -1,18 +1,103 @@
 import pytest
-import subprocess
-import requests
+import tempfile
 import time
 import os
+from contextlib import nullcontext
 from opentelemetry import trace
-from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# * Compose paths resolved once at import rather than on every session
+_HERE = os.path.dirname(__file__)
+_COMPOSE_DIR = os.path.abspath(os.path.join(_HERE, "..", "docker"))
+_COMPOSE_FILE = os.path.join(_COMPOSE_DIR, "docker-compose.otel.local.yml")
+# * Written by the xdist worker that started the stack, so the controller knows to reap it
+_OWNER_MARKER = os.path.join(_COMPOSE_DIR, ".otel.owner")
+
+# * URL that last answered the collector health probe (reused across retries)
+_healthy_otel_url = None
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--keep-otel",
+        action="store_true",
+        default=False,
+        help="Leave the OTel Collector container running after the test session.",
+    )
+    parser.addoption(
+        "--run-integration",
+        action="store_true",
+        default=False,
+        help="Run tests marked 'integration' (requires Docker / OTel Collector).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "integration: test needs a running OTel Collector (enable with --run-integration)"
+    )
+    config.addinivalue_line(
+        "markers", "telemetry: test touches the global tracer provider and needs it reset"
+    )
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # * Under xdist only the controller runs this after every worker is done, so it reaps a
+    # * collector that one of its workers started (workers can't: siblings may still use it)
+    if hasattr(session.config, "workerinput") or not os.path.exists(_OWNER_MARKER):
+        return
+    os.remove(_OWNER_MARKER)
+    if session.config.getoption("--keep-otel"):
+        return
+    import subprocess
+
+    subprocess.run([
+        "docker-compose", "-f", _COMPOSE_FILE, "down"
+    ], cwd=_COMPOSE_DIR, check=False)
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-integration"):
+        return
+    skip_integration = pytest.mark.skip(reason="needs --run-integration")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip_integration)
+
+
+# * Pay the one-off OTel SDK import cost at session start, not inside the first test's timing
+@pytest.fixture(scope="session", autouse=True)
+def _warmup():
+    import opentelemetry.sdk._logs  # noqa: F401
+    import opentelemetry.sdk.metrics  # noqa: F401
+    import opentelemetry.sdk.trace  # noqa: F401
+    yield
 
 
 # ! This fixture ensures the OpenTelemetry Collector is running before any tests execute.
 @pytest.fixture(scope="session", autouse=True)
-def otel_collector():
+def otel_collector(_warmup, pytestconfig, request):
     """
     Ensure OpenTelemetry Collector is running for tests. If not, start via Docker Compose.
+    Only runs when --run-integration is set and an integration test was collected, so the
+    default unit-test loop never touches Docker.
+    With --keep-otel the container is left up between runs and the last healthy URL is
+    remembered in the pytest cache, so warm runs only probe that one URL.
     """
+    global _healthy_otel_url
+    needs_collector = pytestconfig.getoption("--run-integration") and any(
+        "integration" in item.keywords for item in request.session.items
+    )
+    if not needs_collector:
+        yield {"healthy": False, "url": None}
+        return
+
+    # * Imported lazily so plain unit-test collection never loads requests/urllib3
+    import subprocess
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
     # * Use the Prometheus metrics endpoint for health checking, as /health is not always present on 4318
     # * Try both 127.0.0.1 and localhost for Docker/Windows compatibility
     # * Use correct port (8899) for Prometheus metrics, and add /health as fallback
@@ -22,70 +107,172 @@ def otel_collector():
         "http://127.0.0.1:13133/health",
         "http://localhost:13133/health"
     ]
-    compose_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "docker"))
-    compose_file = os.path.join(compose_dir, "docker-compose.otel.local.yml")
     timeout = 30  # seconds
-    interval = 2  # seconds
+    initial_delay = 0.1  # seconds, grows 1.5x per retry
+    max_delay = 1.0  # seconds
+    keep_otel = pytestconfig.getoption("--keep-otel")
+
+    # * Warm dev loop: reuse the URL that answered during a previous --keep-otel run
+    if keep_otel and _healthy_otel_url is None:
+        _healthy_otel_url = pytestconfig.cache.get("otel/up", None)
 
-    def is_otel_up():
-        for url in otel_urls:
+    # * One keep-alive session for every probe so retries skip the TCP handshake
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(otel_urls), pool_maxsize=len(otel_urls))
+    session.mount("http://", adapter)
+
+    def probe(session, url):
+        # * Accept Prometheus metrics endpoint (text) or health endpoint (JSON)
+        if url.endswith("/health"):
+            # Check for health endpoint JSON (needs the body, so GET)
+            resp = session.get(url, timeout=2)
+            if resp.status_code != 200:
+                return False
             try:
-                resp = requests.get(url, timeout=2)
-                # * Accept Prometheus metrics endpoint (text) or health endpoint (JSON)
-                if resp.status_code == 200:
-                    # Check for health endpoint JSON
-                    if url.endswith("/health"):
-                        try:
-                            data = resp.json()
-                            if data.get("status") == "Server available":
-                                return True
-                        except Exception:
-                            continue
-                    else:
-                        # Assume Prometheus metrics endpoint returns 200 OK
-                        return True
+                return resp.json().get("status") == "Server available"
             except Exception:
-                continue
-        return False
+                return False
+        # * Prometheus metrics body is kilobytes of text we never read; HEAD only needs the status
+        resp = session.head(url, timeout=2, allow_redirects=False)
+        return resp.status_code == 200
 
-    if not is_otel_up():
-        # * Start the OTEL Collector via docker-compose
+    def is_otel_up(session):
+        global _healthy_otel_url
+        # * Once a URL has answered, keep polling only that one
+        if _healthy_otel_url is not None:
+            try:
+                return probe(session, _healthy_otel_url)
+            except Exception:
+                return False
+        # * Fire all probes concurrently and return on the first success
+        ex = ThreadPoolExecutor(max_workers=len(otel_urls))
+        futs = {ex.submit(probe, session, url): url for url in otel_urls}
         try:
-            subprocess.run([
-                "docker-compose", "-f", compose_file, "up", "-d"
-            ], cwd=compose_dir, check=True)
-        except Exception as e:
-            pytest.exit(f"! Failed to start OpenTelemetry Collector: {e}")
-
-        # * Wait for OTEL Collector to be healthy
-        start = time.time()
-        while time.time() - start < timeout:
-            if is_otel_up():
-                break
-            time.sleep(interval)
-        else:
-            pytest.exit("! OpenTelemetry Collector failed to start within timeout.")
+            for fut in as_completed(futs):
+                try:
+                    if fut.result():
+                        _healthy_otel_url = futs[fut]
+                        return True
+                except Exception:
+                    continue
+            return False
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
 
-    yield
-    # todo: Optionally stop the collector after tests (if desired)
+    # * Under pytest-xdist every worker runs this fixture; a file lock makes sure only one
+    # * of them brings the stack up while the others wait and then find it healthy
+    xdist_worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if xdist_worker:
+        from filelock import FileLock
+        bring_up_lock = FileLock(os.path.join(_COMPOSE_DIR, ".otel.lock"))
+    else:
+        bring_up_lock = nullcontext()
+
+    started = False
+    with bring_up_lock:
+        if not is_otel_up(session):
+            # * Stale cache entry: forget it and fall back to probing every URL
+            _healthy_otel_url = None
+            pytestconfig.cache.set("otel/up", None)
+
+            # * Start the OTEL Collector via docker-compose without blocking on it, so
+            # * readiness probing overlaps with container boot
+            # * stderr goes to a temp file, not a pipe: pull/progress output would fill an
+            # * unread pipe and block docker-compose while we are still probing
+            stderr_file = tempfile.TemporaryFile()
+            try:
+                proc = subprocess.Popen([
+                    "docker-compose", "-f", _COMPOSE_FILE, "up", "-d"
+                ], cwd=_COMPOSE_DIR, stderr=stderr_file)
+                started = True
+                if xdist_worker:
+                    # * Still under the lock: record ownership for pytest_sessionfinish
+                    with open(_OWNER_MARKER, "w") as marker:
+                        marker.write(xdist_worker)
+            except Exception as e:
+                session.close()
+                pytest.exit(f"! Failed to start OpenTelemetry Collector: {e}")
+
+            # * Wait for OTEL Collector to be healthy
+            # * Exponential backoff keeps the wait-after-ready short on cold starts
+            start = time.monotonic()
+            delay = initial_delay
+            while time.monotonic() - start < timeout:
+                if is_otel_up(session):
+                    break
+                time.sleep(delay)
+                delay = min(delay * 1.5, max_delay)
+            else:
+                session.close()
+                returncode = proc.poll()
+                if returncode is None:
+                    proc.kill()
+                proc.wait()  # * Reap the killed/exited process
+                stderr_file.close()
+                pytest.exit(
+                    "! OpenTelemetry Collector failed to start within timeout "
+                    f"(docker-compose exit code: {returncode})."
+                )
+
+            # * Collector is healthy: reap docker-compose (no zombie) and surface a failed boot
+            try:
+                proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace").strip()
+            stderr_file.close()
+            if proc.returncode != 0:
+                session.close()
+                pytest.exit(f"! docker-compose up exited with code {proc.returncode}: {stderr}")
 
-# * NOTE: Removed global OpenTelemetry provider resets to avoid ProxyTracerProvider errors.
-# * Test isolation is now handled by patching providers in each test file (see test_client.py).
-# * Only the otel_collector fixture remains here for collector health.
+    if keep_otel:
+        pytestconfig.cache.set("otel/up", _healthy_otel_url)
+
+    # * Publish the probe result so tests can assert on it without another HTTP round trip
+    yield {"healthy": True, "url": _healthy_otel_url}
+    session.close()
+
+    # * Only tear down a collector this session started, and only when not asked to keep it.
+    # * xdist workers never tear down here: the controller does it in pytest_sessionfinish.
+    if started and not keep_otel and not xdist_worker:
+        subprocess.run([
+            "docker-compose", "-f", _COMPOSE_FILE, "down"
+        ], cwd=_COMPOSE_DIR, check=False)
+
+@pytest.fixture(scope="session")
+def telemetry_client(otel_collector):
+    """One real TelemetryClient shared by read-only integration tests (SDK init is the slow part)."""
+    from ..client import TelemetryClient
+
+    client = TelemetryClient("test-service")
+    yield client
+    client.shutdown()
+
+
+# * Single no-op provider reused by every test instead of allocating one per test; it holds
+# * no state, so unlike a shared mock nothing one test configures can leak into the next
+_NOOP_PROVIDER = trace.NoOpTracerProvider()
+
+
+# * NOTE: This is the single provider-reset fixture for the suite. It swaps in the shared no-op
+# * provider (never a raw `_TRACER_PROVIDER = None` reset) to avoid ProxyTracerProvider errors.
+# * Per-file provider patching (see test_client.py) layers on top of it.
 @pytest.fixture(autouse=True)
-def reset_telemetry():
+def reset_telemetry(request):
     """Reset telemetry state between tests with proper mocking"""
-    original_provider = trace.get_tracer_provider()
-    
-    # Create a mock provider that has the required methods
-    mock_provider = MagicMock()
-    mock_provider.add_span_processor = MagicMock()
-    mock_provider.shutdown = MagicMock()
+    # * Only tests marked `telemetry` touch providers; everything else skips the swap
+    if "telemetry" not in request.node.keywords:
+        yield
+        return
+
+    original_provider = trace._TRACER_PROVIDER
     
-    # Set the mock provider
-    trace.set_tracer_provider(mock_provider)
+    # * Assign directly: set_tracer_provider() only honours the first call per process
+    trace._TRACER_PROVIDER = _NOOP_PROVIDER
     
     yield
     
     # Restore original provider after test
-    trace.set_tracer_provider(original_provider)
+    trace._TRACER_PROVIDER = original_provider
@@ -1,31 +1,37 @@
-from unittest.mock import patch
+from unittest.mock import Mock, create_autospec, patch
 
 import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.trace import TracerProvider
 
 from ..client import TelemetryClient
 
+pytestmark = pytest.mark.telemetry
+
 
 @pytest.fixture
 def mock_tracer_provider():
     # * Disable SSL verification for OTLP exporter in local/dev testing
     # import ssl
     # ssl._create_default_https_context = ssl._create_unverified_context
+    # * Stub the batch processor so no real export thread or exporter I/O runs per test
     with patch('app.core.telemetry.client.TracerProvider') as mock_class, \
+         patch('app.core.telemetry.client.BatchSpanProcessor'), \
          patch('opentelemetry.trace.set_tracer_provider') as set_provider, \
          patch('opentelemetry.trace.get_tracer_provider') as get_provider:
-        mock_instance = MagicMock()
-        mock_instance.add_span_processor = MagicMock()
-        mock_instance.shutdown = MagicMock()
+        # * Plain Mock: no magic-method protocol setup, and spec_set rejects typos
+        mock_instance = Mock(spec_set=TracerProvider)
         get_provider.return_value = mock_instance
         yield mock_class
+
+
 @pytest.fixture
 def mock_meter_provider():
-    with patch('app.core.telemetry.client.MeterProvider') as mock:
+    # * Autospec'd class: instances are spec_set too, so misspelled provider calls fail loudly
+    with patch('app.core.telemetry.client.MeterProvider', create_autospec(MeterProvider, spec_set=True)) as mock:
         with patch('opentelemetry.metrics.set_meter_provider') as set_provider:
             yield mock
 
-from unittest.mock import MagicMock
-
 
 def test_client_initialization(mock_tracer_provider, mock_meter_provider):
     client = TelemetryClient("test-service", "1.0.0")
@@ -33,46 +39,35 @@ def test_client_initialization(mock_tracer_provider, mock_meter_provider):
     assert mock_meter_provider.called, "MeterProvider was not called during TelemetryClient init"
     assert client.service_name == "test-service", f"Expected service_name 'test-service', got: {client.service_name}"
     assert client.service_version == "1.0.0", f"Expected version '1.0.0', got: {client.service_version}"
-    """Test that client properly initializes tracing and metrics"""
-    # Removed duplicate code block
+
+
+def test_client_passes_sampler_to_tracer_provider(mock_tracer_provider, mock_meter_provider):
+    sampler = Mock()
+    # * object() has no add_span_processor, so the client builds its own TracerProvider
+    with patch('opentelemetry.trace.get_tracer_provider', return_value=object()):
+        TelemetryClient("test-service", auto_init=False, sampler=sampler)
+    assert mock_tracer_provider.call_args.kwargs["sampler"] is sampler
 
 
 def test_shutdown(mock_tracer_provider, mock_meter_provider):
     with patch('opentelemetry.metrics.get_meter_provider') as get_meter_provider:
-        mock_meter_provider_inst = MagicMock()
+        mock_meter_provider_inst = Mock(spec_set=MeterProvider)
         get_meter_provider.return_value = mock_meter_provider_inst
-        mock_meter_provider_inst.shutdown = MagicMock()
         # Patch get_tracer_provider to return the same mock as mock_tracer_provider.return_value
         with patch('opentelemetry.trace.get_tracer_provider', return_value=mock_tracer_provider.return_value):
             client = TelemetryClient("test-service")
             client.shutdown()
             # TracerProvider shutdown is handled by the fixture mock
-            mock_tracer_provider.return_value.shutdown.assert_called_once()
+            assert mock_tracer_provider.return_value.shutdown.call_count == 1
         assert mock_meter_provider_inst.shutdown.called, "MeterProvider.shutdown was not called"
     # Only test shutdown within the patch context above to avoid AttributeError on _ProxyMeterProvider.
-    # The duplicate call below is removed.
-    #
-    # assert mock_tracer_provider.return_value.shutdown.called, "TracerProvider.shutdown was not called"
-    # assert mock_meter_provider.return_value.shutdown.called, "MeterProvider.shutdown was not called"
 
 # * Additional test to verify collector health endpoint with Docker/Windows fallback
-import requests
-import pytest
-
-def test_collector_health_endpoint():
-    """Test collector health endpoint on both 127.0.0.1 and localhost (Docker/Windows compatibility)."""
-    urls = ["http://127.0.0.1:13133/health", "http://localhost:13133/health"]
-    healthy = False
-    for url in urls:
-        try:
-            resp = requests.get(url, timeout=2)
-            if resp.status_code == 200 and resp.json().get("status") == "Server available":
-                healthy = True
-                break
-        except Exception:
-            continue
-    assert healthy, (
-        "OTel collector health endpoint not available on any host alias. URLs checked: "
-        f"{urls}. If running in CI or Docker, ensure OTEL Collector is up."
+@pytest.mark.integration
+def test_collector_health_endpoint(otel_collector):
+    """Test collector health as already probed by the session fixture (127.0.0.1 and localhost)."""
+    assert otel_collector["healthy"], (
+        "OTel collector health endpoint not available on any host alias. "
+        "If running in CI or Docker, ensure OTEL Collector is up."
     )
-
+    assert otel_collector["url"], f"No healthy collector URL recorded: {otel_collector}"
@@ -2,51 +2,88 @@ from unittest.mock import patch
 
 import pytest
 
-from ..decorators import trace_function, track_errors
+from ..decorators import observe, trace_function, track_errors
 
 
-def test_trace_function():
+@pytest.fixture(scope="module", autouse=True)
+def _otel_patches():
+    """Start the OTel API patches once per module instead of once per test."""
+    p1 = patch('app.core.telemetry.decorators._TRACER')
+    p2 = patch('opentelemetry.trace.get_current_span')
+    m1, m2 = p1.start(), p2.start()
+    yield m1, m2
+    p1.stop()
+    p2.stop()
+
+
+@pytest.fixture
+def mock_tracer(_otel_patches):
+    mock = _otel_patches[0]
+    mock.reset_mock()
+    return mock
+
+
+@pytest.fixture
+def mock_span(_otel_patches):
+    mock = _otel_patches[1]
+    mock.reset_mock()
+    return mock
+
+
+def test_trace_function(mock_tracer):
     """Test that trace_function decorator properly creates spans."""
     @trace_function(name="test-span")
     def test_func():
         return "success"
     
-    with patch('opentelemetry.trace.get_tracer') as mock_tracer:
-        result = test_func()
-        assert result == "success"
-        assert mock_tracer.return_value.start_as_current_span.called
-        call_args = mock_tracer.return_value.start_as_current_span.call_args
-        print(f"call_args for start_as_current_span: {call_args}")
-        # Check if 'name' is in args or kwargs
-        args, kwargs = call_args
-        if 'name' in kwargs:
-            assert kwargs['name'] == "test-span"
-        else:
-            # If positional, assume first arg is name
-            assert args[0] == "test-span"
-
-
-def test_track_errors():
+    result = test_func()
+    assert result == "success"
+    assert mock_tracer.start_as_current_span.called
+    call_args = mock_tracer.start_as_current_span.call_args
+    print(f"call_args for start_as_current_span: {call_args}")
+    # Check if 'name' is in args or kwargs
+    args, kwargs = call_args
+    if 'name' in kwargs:
+        assert kwargs['name'] == "test-span"
+    else:
+        # If positional, assume first arg is name
+        assert args[0] == "test-span"
+
+
+def test_track_errors(mock_span):
     """Test that track_errors decorator properly records exceptions."""
     @track_errors
     def failing_func():
         raise ValueError("test error")
     
-    with patch('opentelemetry.trace.get_current_span') as mock_span:
-        mock_span.return_value.is_recording.return_value = True
-        with pytest.raises(ValueError):
-            failing_func()
-        assert mock_span.return_value.record_exception.called
+    mock_span.return_value.is_recording.return_value = True
+    with pytest.raises(ValueError):
+        failing_func()
+    assert mock_span.return_value.record_exception.called
 
 
-def test_track_errors_when_not_recording():
+def test_track_errors_when_not_recording(mock_span):
     """Test that track_errors doesn't record when span isn't recording."""
     @track_errors
     def failing_func():
         raise ValueError("test error")
     
-    with patch('opentelemetry.trace.get_current_span') as mock_span:
-        mock_span.return_value.is_recording.return_value = False
-        with pytest.raises(ValueError):
-            failing_func()
-        assert not mock_span.return_value.record_exception.called
+    mock_span.return_value.is_recording.return_value = False
+    with pytest.raises(ValueError):
+        failing_func()
+    assert not mock_span.return_value.record_exception.called
+
+
+def test_observe_single_span_records_exception(mock_tracer):
+    """Test that observe traces and records errors on the one span it opens."""
+    @observe(name="observed", threshold_ms=0)
+    def failing_func():
+        raise ValueError("test error")
+    
+    with pytest.raises(ValueError):
+        failing_func()
+    assert mock_tracer.start_as_current_span.call_count == 1
+    args, _ = mock_tracer.start_as_current_span.call_args
+    assert args[0] == "observed"
+    span = mock_tracer.start_as_current_span.return_value.__enter__.return_value
+    assert span.record_exception.called
@@ -0,0 +1,117 @@
+from unittest.mock import Mock
+
+from opentelemetry.sdk.metrics import Counter
+from opentelemetry.sdk.metrics.export import AggregationTemporality, MetricExportResult
+from opentelemetry.sdk.metrics.view import SumAggregation
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from ..exporters import (
+    ExportCircuitBreaker,
+    PooledLogExporter,
+    PooledMetricExporter,
+    PooledSpanExporter,
+    RetryingSpanExporter,
+    configure_grafana_exporters,
+    share_grpc_channel,
+)
+
+
+def make_span_exporter(result=SpanExportResult.SUCCESS):
+    exporter = Mock()
+    exporter.export.return_value = result
+    return exporter
+
+
+def test_pool_dispatches_round_robin():
+    members = iter([make_span_exporter(), make_span_exporter()])
+    pool = PooledSpanExporter(lambda: next(members), size=2)
+    for _ in range(3):
+        assert pool.export(["span"]) == SpanExportResult.SUCCESS
+    first, second = pool.exporters
+    assert (first.export.call_count, second.export.call_count) == (2, 1)
+
+
+def test_open_breaker_short_circuits_exports():
+    inner = make_span_exporter(SpanExportResult.FAILURE)
+    breaker = ExportCircuitBreaker(failure_threshold=2, name="test-traces")
+    pool = PooledSpanExporter(lambda: inner, breaker=breaker)
+    for _ in range(3):
+        assert pool.export(["span"]) == SpanExportResult.FAILURE
+    # * The third batch is dropped by the open breaker without reaching the exporter
+    assert breaker.is_open
+    assert inner.export.call_count == 2
+
+
+def test_metric_pool_copies_first_exporter_preferences():
+    temporality = {Counter: AggregationTemporality.DELTA}
+    aggregation = {Counter: SumAggregation()}
+    inner = Mock(_preferred_temporality=temporality, _preferred_aggregation=aggregation)
+    inner.export.return_value = MetricExportResult.SUCCESS
+    pool = PooledMetricExporter(lambda: inner)
+    assert pool._preferred_temporality[Counter] is AggregationTemporality.DELTA
+    assert pool._preferred_aggregation[Counter] is aggregation[Counter]
+
+
+def test_log_pool_force_flush_reaches_every_member():
+    members = iter([Mock(), Mock()])
+    pool = PooledLogExporter(lambda: next(members), size=2)
+    assert pool.force_flush(timeout_millis=100)
+    for exporter in pool.exporters:
+        exporter.force_flush.assert_called_once_with(timeout_millis=100)
+
+
+def test_shared_channel_closes_after_both_exporters_shut_down():
+    channel = Mock()
+    source, target = Mock(_channel=channel), Mock()
+    share_grpc_channel(source, target)
+    # * The span exporter shuts down first; the metric exporter's final export still needs the channel
+    source._channel.close()
+    channel.close.assert_not_called()
+    target._channel.close()
+    channel.close.assert_called_once()
+
+
+def test_retrying_exporter_backs_off_until_success():
+    inner = Mock()
+    inner.export.side_effect = [SpanExportResult.FAILURE, SpanExportResult.FAILURE, SpanExportResult.SUCCESS]
+    exporter = RetryingSpanExporter(inner, attempt_timeout=0, initial_backoff=0)
+    assert exporter.export(["span"]) == SpanExportResult.SUCCESS
+    assert inner.export.call_count == 3
+
+
+def test_retrying_exporter_gives_up_after_max_attempts():
+    inner = make_span_exporter(SpanExportResult.FAILURE)
+    exporter = RetryingSpanExporter(inner, attempt_timeout=0, max_attempts=5, initial_backoff=0)
+    assert exporter.export(["span"]) == SpanExportResult.FAILURE
+    assert inner.export.call_count == 5
+
+
+def test_retrying_exporter_never_starts_an_attempt_past_the_deadline():
+    inner = make_span_exporter(SpanExportResult.FAILURE)
+    # * The exporter's own timeout (and its built-in retries) already spends the whole budget
+    exporter = RetryingSpanExporter(inner, attempt_timeout=30, deadline=30)
+    assert exporter.export(["span"]) == SpanExportResult.FAILURE
+    assert inner.export.call_count == 1
+
+
+def test_http_exporters_replace_the_tempo_traces_path():
+    """Verify OTLP/HTTP URLs replace TEMPO_EXPORTER_ENDPOINT's /api/traces path and keep the timeout."""
+    _, metric_exporter = configure_grafana_exporters(
+        "https://tempo.example.com/api/traces", "user", "key", timeout=30, transport="http"
+    )
+    (exporter,) = metric_exporter.exporters
+    assert exporter._endpoint == "https://tempo.example.com/v1/metrics"
+    assert exporter._timeout == 30
+
+
+def test_grafana_metric_pool_shares_the_span_pool_channels():
+    """Verify each managed-path metric exporter reuses its span counterpart's gRPC channel."""
+    span_pool, metric_pool = configure_grafana_exporters(
+        "https://tempo.example.com:443/api/traces", "user", "key", pool_size=2
+    )
+    try:
+        for span_member, metric_member in zip(span_pool.exporters, metric_pool.exporters):
+            assert metric_member._channel is span_member._exporter._channel
+    finally:
+        metric_pool.shutdown()
+        span_pool.shutdown()
@@ -8,21 +8,50 @@ from fastapi import status
 from fastapi.responses import JSONResponse
 
 from ..client import TelemetryClient
-from ..health_check import check_telemetry_health, health_response
+from .. import health_check
+from ..health_check import (
+    _reset_health_cache,
+    cached_health_response,
+    check_telemetry_health,
+    health_response,
+    register_health_metrics,
+    stop_health_metrics,
+)
 
+pytestmark = pytest.mark.telemetry
 
-def test_health_check_healthy():
+
+@pytest.fixture(scope="module")
+def client_template():
+    """Spec'd TelemetryClient mock built once per module (spec introspection is the slow part)."""
+    return MagicMock(spec=TelemetryClient)
+
+
+@pytest.fixture
+def mock_client(client_template):
+    """Per-test view of the shared template with call history and memoized health cleared."""
+    client_template.reset_mock()
+    _reset_health_cache(client_template)
+    baseline = set(vars(client_template))
+    yield client_template
+    # * reset_mock() keeps attributes a test assigned (circuit_breaker, circuit_breakers, ...);
+    # * drop them here, even when the test failed, so later tests see the bare spec'd template
+    for name in set(vars(client_template)) - baseline:
+        if not name.startswith("_mock_"):
+            delattr(client_template, name)
+    _reset_health_cache(client_template)
+
+
+def test_health_check_healthy(mock_client):
     """Test health check with healthy client."""
-    mock_client = MagicMock(spec=TelemetryClient)
     mock_client.circuit_breaker = MagicMock(is_open=False)
     
     result = check_telemetry_health(mock_client)
     assert result["status"] == "healthy", f"Expected healthy, got: {result}"
 
 
-def test_health_check_degraded():
+def test_health_check_degraded(mock_client):
     """Test health check with open circuit breaker."""
-    mock_client = MagicMock(spec=TelemetryClient)
     mock_client.circuit_breaker = MagicMock(is_open=True)
     
     result = check_telemetry_health(mock_client)
@@ -30,6 +59,28 @@ def test_health_check_degraded():
     assert "circuit_breaker" in result, f"circuit_breaker key missing in result: {result}"
 
 
+def test_health_check_reports_each_signal_breaker(mock_client):
+    """Test that one open per-signal breaker degrades health and is named in the result."""
+    mock_client.circuit_breakers = {
+        "traces": MagicMock(is_open=False),
+        "metrics": MagicMock(is_open=True),
+    }
+
+    result = check_telemetry_health(mock_client)
+    assert result["status"] == "degraded", f"Expected degraded, got: {result}"
+    assert result["circuit_breakers"] == {"traces": "closed", "metrics": "open"}
+
+
+def test_health_check_result_is_read_only(mock_client):
+    """Test that one caller can't corrupt the memoized result other callers receive."""
+    mock_client.circuit_breaker = MagicMock(is_open=False)
+
+    result = check_telemetry_health(mock_client)
+    with pytest.raises(TypeError):
+        result["status"] = "unhealthy"
+    assert check_telemetry_health(mock_client)["status"] == "healthy"
+
+
 def test_health_check_uninitialized():
     """Test health check when telemetry is not initialized."""
     from ..health_check import check_telemetry_health
@@ -57,28 +108,60 @@ def test_health_response_unhealthy():
         assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE, f"Expected 503, got: {response.status_code}"
 
 
+def test_cached_health_response_follows_the_client(mock_client):
+    """Test the cached endpoint serves the memoized body and re-renders for a new client."""
+    import json
+    mock_client.circuit_breaker = MagicMock(is_open=True)
+    with patch("app.core.telemetry.telemetry.get_telemetry", return_value=mock_client):
+        response = cached_health_response()
+        assert response.status_code == 200
+        assert json.loads(response.body)["status"] == "degraded"
+        # * Within the TTL the body comes from the cache entry, without another probe
+        mock_client.circuit_breaker.is_open = False
+        assert json.loads(cached_health_response().body)["status"] == "degraded"
+
+    other = MagicMock(spec=TelemetryClient)
+    other.circuit_breaker = MagicMock(is_open=False)
+    with patch("app.core.telemetry.telemetry.get_telemetry", return_value=other):
+        assert json.loads(cached_health_response().body)["status"] == "healthy"
+
+
+def test_cached_health_response_before_setup():
+    """Test the cached endpoint answers 503 uninitialized instead of raising before setup."""
+    import json
+    with patch("app.core.telemetry.telemetry.get_telemetry", side_effect=RuntimeError("Telemetry not initialized")):
+        response = cached_health_response()
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert json.loads(response.body)["status"] == "uninitialized"
+        assert health_response().status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def test_stop_health_metrics_ends_refresh_thread(mock_client):
+    """Test that stopping health metrics ends the refresh thread and allows registering again."""
+    stop_health_metrics()  # start from a clean slate
+    with patch.object(health_check, "_health_gauge", None), \
+            patch.object(health_check, "_create_health_gauge") as create_gauge:
+        register_health_metrics(lambda: mock_client)
+        first_thread = health_check._health_refresh_thread
+        first_stop = health_check._health_refresh_stop
+        stop_health_metrics()
+        assert first_stop.is_set()
+        assert not first_thread.is_alive()
+        assert health_check._HEALTH_STATUS_NUMERIC == 0.0
+
+        # * Re-registering after shutdown starts a new thread but keeps the existing gauge
+        register_health_metrics(lambda: mock_client)
+        assert health_check._health_refresh_stop not in (None, first_stop)
+        stop_health_metrics()
+        create_gauge.assert_called_once()
+
+
 # Integration test example (would need proper test client setup)
 @pytest.mark.integration
 # * This test demonstrates how to check the collector health endpoint using both 127.0.0.1 and localhost for Docker/Windows compatibility.
-def test_health_check_integration():
-    """Integration test with actual telemetry client and HTTP health endpoint."""
-    import requests
-    from ..client import TelemetryClient
-    telemetry_client = TelemetryClient("test-service")
-    urls = [
-        "http://127.0.0.1:13133/health",
-        "http://localhost:13133/health"
-    ]
-    healthy = False
-    for url in urls:
-        try:
-            resp = requests.get(url, timeout=2)
-            if resp.status_code == 200 and resp.json().get("status") == "Server available":
-                healthy = True
-                break
-        except Exception:
-            continue
-    assert healthy, "OTel collector health endpoint not available on any host alias"
+def test_health_check_integration(otel_collector, telemetry_client):
+    """Integration test with a real telemetry client and collector health from the session fixture."""
+    assert otel_collector["healthy"], "OTel collector health endpoint not available on any host alias"
     # Also check internal health logic
     result = check_telemetry_health(telemetry_client)
     assert result["status"] in ["healthy", "degraded"]
@@ -0,0 +1,45 @@
+from unittest.mock import Mock
+
+import pytest
+from opentelemetry.trace import StatusCode
+
+from ..sampling import TailSampler
+
+
+def make_span(trace_id=1, root=True, status=StatusCode.UNSET, duration_ms=1):
+    """Minimal ReadableSpan stand-in: only the fields TailSampler reads."""
+    span = Mock()
+    span.context.trace_id = trace_id
+    span.parent = None if root else Mock(is_remote=False)
+    span.status.status_code = status
+    span.start_time = 0
+    span.end_time = duration_ms * 1_000_000
+    return span
+
+
+@pytest.fixture
+def delegate():
+    return Mock()
+
+
+def test_tail_sampler_drops_fast_successful_trace(delegate):
+    sampler = TailSampler(delegate, latency_threshold_ms=100)
+    sampler.on_end(make_span(root=False))
+    sampler.on_end(make_span(root=True))
+    assert delegate.on_end.call_count == 0
+
+
+def test_tail_sampler_forwards_whole_trace_on_error(delegate):
+    sampler = TailSampler(delegate, latency_threshold_ms=100)
+    child = make_span(root=False, status=StatusCode.ERROR)
+    root = make_span(root=True)
+    sampler.on_end(child)
+    sampler.on_end(root)
+    # * Every buffered span of the trace is forwarded, in end order
+    assert [c.args[0] for c in delegate.on_end.call_args_list] == [child, root]
+
+
+def test_tail_sampler_forwards_slow_trace(delegate):
+    sampler = TailSampler(delegate, latency_threshold_ms=100)
+    sampler.on_end(make_span(root=True, duration_ms=250))
+    assert delegate.on_end.call_count == 1
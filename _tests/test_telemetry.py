@@ -3,7 +3,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from fastapi import FastAPI
 
-from ..telemetry import get_telemetry, setup_telemetry, shutdown_telemetry
+from ..telemetry import get_meter, get_telemetry, get_tracer, setup_telemetry, shutdown_telemetry
 
 
 @pytest.fixture
@@ -13,7 +13,25 @@ def mock_app():
     return app
 
 
-def test_setup_telemetry(mock_app):
+@pytest.fixture
+def isolated_setup(monkeypatch):
+    """
+    Unpublished telemetry module whose setup builds no real exporters, processors or signal handlers.
+    
+    The real setup chains a SIGTERM handler and starts BatchSpanProcessor threads
+    and gRPC channels that would outlive the test.
+    """
+    from app.core.telemetry import telemetry as telemetry_module
+    monkeypatch.setattr(telemetry_module, "telemetry_client", None)  # setup is memoized; start from scratch
+    # * setup rebinds the module tracer/meter; monkeypatch restores them afterwards
+    monkeypatch.setattr(telemetry_module, "_tracer", telemetry_module._tracer)
+    monkeypatch.setattr(telemetry_module, "_meter", telemetry_module._meter)
+    for name in ("_install_sigterm_handler", "PooledSpanExporter", "PooledMetricExporter", "BatchSpanProcessor"):
+        monkeypatch.setattr(telemetry_module, name, MagicMock())
+    return telemetry_module
+
+
+def test_setup_telemetry(mock_app, isolated_setup):
     """Verify telemetry setup properly instruments FastAPI."""
     with patch('app.core.telemetry.telemetry.TelemetryClient') as mock_client:
         client = setup_telemetry(mock_app)
@@ -22,6 +40,31 @@ def test_setup_telemetry(mock_app):
         assert mock_client.return_value == client
 
 
+def test_setup_telemetry_is_memoized(mock_app, isolated_setup):
+    """Verify repeated setup returns the first client instead of building another."""
+    with patch('app.core.telemetry.telemetry.TelemetryClient') as mock_client:
+        first = setup_telemetry(mock_app)
+        second = setup_telemetry(FastAPI())
+        assert first is second
+        assert mock_client.call_count == 1
+
+
+def test_failed_setup_leaves_client_unpublished(mock_app, isolated_setup):
+    """Verify a setup that raises part-way never publishes its half-configured client."""
+    with patch('app.core.telemetry.telemetry.TelemetryClient') as mock_client:
+        mock_client.return_value.instrument_fastapi.side_effect = RuntimeError("boom")
+        with pytest.raises(RuntimeError, match="boom"):
+            setup_telemetry(mock_app)
+    assert isolated_setup.telemetry_client is None
+
+
+def test_get_tracer_bound_at_setup(mock_app, isolated_setup):
+    """Verify get_tracer() returns the configured client's tracer after setup."""
+    with patch('app.core.telemetry.telemetry.TelemetryClient') as mock_client:
+        setup_telemetry(mock_app)
+        assert get_tracer() is mock_client.return_value.get_tracer.return_value
+
+
 def test_get_telemetry_before_setup():
     """Verify proper error when getting telemetry before setup."""
     from app.core.telemetry import telemetry as telemetry_module
@@ -35,4 +78,15 @@ def test_shutdown_telemetry():
     mock_client = MagicMock()
     with patch('app.core.telemetry.telemetry.telemetry_client', mock_client):
         shutdown_telemetry()
-        mock_client.shutdown.assert_called_once()
+        assert mock_client.shutdown.call_count == 1
+
+
+@pytest.mark.parametrize("enable_prometheus", [True, False])
+def test_setup_telemetry_binds_meter_with_and_without_prometheus(
+    mock_app, isolated_setup, monkeypatch, enable_prometheus
+):
+    """Verify setup completes and binds an OpenTelemetry meter whether or not Prometheus is enabled."""
+    monkeypatch.setattr(isolated_setup, "_ENABLE_PROMETHEUS", enable_prometheus)
+    with patch('app.core.telemetry.telemetry.TelemetryClient') as mock_client:
+        assert setup_telemetry(mock_app) is mock_client.return_value
+    assert callable(get_meter().create_counter)
@@ -4,10 +4,8 @@ import os
 from contextlib import contextmanager
 from typing import Any
 
-import grpc
-from circuitbreaker import circuit
 from opentelemetry import metrics, trace
-from opentelemetry._logs import set_logger_provider
+from opentelemetry._logs import get_logger_provider, set_logger_provider
 from opentelemetry.exporter.otlp.proto.grpc._log_exporter import OTLPLogExporter
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
@@ -21,19 +19,59 @@ from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.sampling import Sampler
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
+from .config import (
+    OTEL_BSP_EXPORT_TIMEOUT,
+    OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+    OTEL_BSP_MAX_QUEUE_SIZE,
+    OTEL_BSP_SCHEDULE_DELAY,
+    OTEL_EXPORTER_CONNECTION_POOL_SIZE,
+)
+from .exporters import (
+    ExportCircuitBreaker,
+    PooledLogExporter,
+    PooledMetricExporter,
+    PooledSpanExporter,
+    grpc_compression,
+)
+
 logger = logging.getLogger(__name__)
 
+# Resolved once; a ProxyTracer picks up the real provider lazily if it is set after import
+_TRACER = trace.get_tracer(__name__)
+
 
 class TelemetryClient:
     def __init__(self, service_name: str, service_version: str = "1.0.0", auto_init: bool = True, 
-                 instance_id: str = None, environment: str = None):
+                 instance_id: str = None, environment: str = None,
+                 connection_pool_size: int | None = None, sampler: Sampler | None = None):
         """Production-ready telemetry client with metrics and proper shutdown."""
         self.service_name = service_name
         self.service_version = service_version
         self.instance_id = instance_id or f"{service_name}-{os.getpid()}"
         self.environment = environment or os.getenv("ENVIRONMENT", "development")
+        # Number of independent gRPC channels per OTLP exporter
+        self.connection_pool_size = connection_pool_size or OTEL_EXPORTER_CONNECTION_POOL_SIZE
+        # Head sampler for the TracerProvider; None keeps the SDK's OTEL_TRACES_SAMPLER default
+        self.sampler = sampler
+        # One breaker per signal: a failing metrics path must not drop span and log batches,
+        # and each breaker is only driven by its own signal's export thread
+        self.circuit_breakers = {
+            signal: ExportCircuitBreaker(name=f"{service_name}-otlp-{signal}")
+            for signal in ("traces", "metrics", "logs")
+        }
+        # Bumped whenever exporters change so health checks rebuild their probe
+        self._exporters_version = 0
+        
+        # Built once and shared by the tracer, meter and logger providers
+        self._resource = Resource.create({
+            "service.name": self.service_name,
+            "service.version": self.service_version,
+            "service.instance.id": self.instance_id,
+            "environment": self.environment,
+        })
         
         # Always initialize the basic resource and providers
         self._initialize_base_providers()
@@ -46,18 +84,13 @@ class TelemetryClient:
 
     def _initialize_base_providers(self):
         """Initialize base trace and metric providers without exporters"""
-        resource_attributes = {
-            "service.name": self.service_name,
-            "service.version": self.service_version,
-            "service.instance.id": self.instance_id,
-            "environment": self.environment,
-        }
-        
-        resource = Resource.create(resource_attributes)
+        resource = self._resource
         
         # Initialize TracerProvider if not already set
         if not hasattr(trace.get_tracer_provider(), 'add_span_processor'):
-            trace.set_tracer_provider(TracerProvider(resource=resource))
+            trace.set_tracer_provider(TracerProvider(resource=resource, sampler=self.sampler))
+        elif self.sampler is not None:
+            logger.warning("TracerProvider already set; ignoring the configured sampler")
         
         # Initialize MeterProvider if not already set  
         try:
@@ -68,43 +101,47 @@ class TelemetryClient:
         except Exception as e:
             logger.warning(f"MeterProvider already initialized or error setting: {e}")
 
-    @circuit(
-        failure_threshold=3,
-        recovery_timeout=30,
-        expected_exception=(grpc.RpcError, ConnectionError, RuntimeError),
-        fallback_function=lambda e: logger.warning(f"Telemetry circuit open: {str(e)}"),
-    )
     def _initialize_tracing(self):
         """Initialize tracing with production-ready configuration."""
-        otlp_exporter = OTLPSpanExporter(
-            endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317"),
-            insecure=True,
-            timeout=2  # Fast timeout for non-blocking operation
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
+        compression = grpc_compression()
+        # Each pooled exporter opens its own channel; batches are spread round-robin
+        otlp_exporter = PooledSpanExporter(
+            lambda: OTLPSpanExporter(
+                endpoint=endpoint,
+                insecure=True,
+                timeout=2,  # Fast timeout for non-blocking operation
+                compression=compression,
+            ),
+            self.connection_pool_size,
+            self.circuit_breakers["traces"],
         )
 
-        # Use optimized batch processor settings
+        # Batch settings come from config.py so high-throughput services don't drop spans
         span_processor = BatchSpanProcessor(
             otlp_exporter,
-            max_queue_size=2048,  # Larger queue to reduce blocking
-            export_timeout_millis=1000,  # 1s export timeout
-            schedule_delay_millis=500,  # 500ms delay between exports
-            max_export_batch_size=512  # Larger batches
+            max_queue_size=OTEL_BSP_MAX_QUEUE_SIZE,
+            export_timeout_millis=OTEL_BSP_EXPORT_TIMEOUT,
+            schedule_delay_millis=OTEL_BSP_SCHEDULE_DELAY,
+            max_export_batch_size=OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
         )
         trace.get_tracer_provider().add_span_processor(span_processor)
 
-    @circuit(
-        failure_threshold=3,
-        recovery_timeout=30,
-        expected_exception=(grpc.RpcError, ConnectionError, RuntimeError),
-    )
     def _initialize_metrics(self):
         """Initialize metrics collection."""
-        metric_exporter = OTLPMetricExporter(
-            endpoint=os.getenv(
-                "OTEL_EXPORTER_OTLP_METRICS_ENDPOINT", "http://localhost:4317"
+        endpoint = os.getenv(
+            "OTEL_EXPORTER_OTLP_METRICS_ENDPOINT", "http://localhost:4317"
+        )
+        compression = grpc_compression()
+        metric_exporter = PooledMetricExporter(
+            lambda: OTLPMetricExporter(
+                endpoint=endpoint,
+                # ! Respect insecure flag for consistency and security
+                insecure=True,
+                compression=compression,
             ),
-            # ! Respect insecure flag for consistency and security
-            insecure=True,
+            self.connection_pool_size,
+            self.circuit_breakers["metrics"],
         )
         metric_reader = PeriodicExportingMetricReader(metric_exporter)
         
@@ -115,68 +152,102 @@ class TelemetryClient:
                 current_provider._metric_readers.append(metric_reader)
             elif type(current_provider).__name__ == 'NoOpMeterProvider':
                 # Only set if it's the default NoOp provider
-                metrics.set_meter_provider(MeterProvider(metric_readers=[metric_reader]))
+                metrics.set_meter_provider(
+                    MeterProvider(resource=self._resource, metric_readers=[metric_reader])
+                )
             else:
                 logger.warning("MeterProvider already exists, skipping metrics setup")
         except Exception as e:
             logger.warning(f"Failed to setup metrics exporter: {e}")
 
-    @circuit(
-        failure_threshold=3,
-        recovery_timeout=30,
-        expected_exception=(grpc.RpcError, ConnectionError, RuntimeError),
-    )
     def _initialize_logging(self):
         """Initialize logging with OTLP exporter for Loki"""
-        resource = Resource.create(
-            {
-                "service.name": self.service_name,
-                "service.version": self.service_version,
-                "environment": os.getenv("ENVIRONMENT", "development"),
-            }
+        logger_provider = LoggerProvider(resource=self._resource)
+        endpoint = os.getenv(
+            "OTEL_EXPORTER_OTLP_LOGS_ENDPOINT", "http://localhost:4317"
         )
-        logger_provider = LoggerProvider(resource=resource)
-        log_exporter = OTLPLogExporter(
-            endpoint=os.getenv(
-                "OTEL_EXPORTER_OTLP_LOGS_ENDPOINT", "http://localhost:4317"
-            ),
-            insecure=True,
+        compression = grpc_compression()
+        log_exporter = PooledLogExporter(
+            lambda: OTLPLogExporter(endpoint=endpoint, insecure=True, compression=compression),
+            self.connection_pool_size,
+            self.circuit_breakers["logs"],
+        )
+        log_processor = BatchLogRecordProcessor(
+            log_exporter,
+            max_queue_size=OTEL_BSP_MAX_QUEUE_SIZE,
+            export_timeout_millis=OTEL_BSP_EXPORT_TIMEOUT,
+            schedule_delay_millis=OTEL_BSP_SCHEDULE_DELAY,
+            max_export_batch_size=OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
         )
-        log_processor = BatchLogRecordProcessor(log_exporter)
         logger_provider.add_log_record_processor(log_processor)
         set_logger_provider(logger_provider)
         # Pipe Python logs into OpenTelemetry
         handler = LoggingHandler(level=logging.NOTSET, logger_provider=logger_provider)
         logging.getLogger().addHandler(handler)
 
-    def instrument_fastapi(self, app):
-        """Instrument FastAPI application for automatic tracing."""
-        FastAPIInstrumentor.instrument_app(app)
+    def instrument_fastapi(self, app, excluded_urls: str | None = None):
+        """
+        Instrument FastAPI application for automatic tracing.
+        excluded_urls is a comma-separated list of URL regexes left untraced; when None
+        the instrumentor falls back to OTEL_PYTHON_FASTAPI_EXCLUDED_URLS.
+        """
+        FastAPIInstrumentor.instrument_app(app, excluded_urls=excluded_urls)
 
     @contextmanager
     def start_span(self, name: str, attributes: dict[str, Any] | None):
         """Context manager for creating spans with proper error handling."""
-        tracer = trace.get_tracer(__name__)
-        with tracer.start_as_current_span(name) as span:
+        with _TRACER.start_as_current_span(name) as span:
             try:
                 if attributes:
-                    for k, v in attributes.items():
-                        span.set_attribute(k, str(v))
+                    span.set_attributes({k: str(v) for k, v in attributes.items()})
                 yield span
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(trace.Status(trace.StatusCode.ERROR))
-                logger.error(f"Error in span {name}: {str(e)}")
+                logger.error("Error in span %s: %s", name, e)
                 raise
 
+    @contextmanager
+    def start_span_detached(self, name: str, attributes: dict[str, Any] | None = None):
+        """
+        Context manager for leaf spans that will never have children.
+        The span is parented to the current context but is not made current itself,
+        skipping the context attach/detach that start_span pays on every call.
+        """
+        span = _TRACER.start_span(name, attributes=attributes and {k: str(v) for k, v in attributes.items()})
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+            logger.error("Error in span %s: %s", name, e)
+            raise
+        finally:
+            span.end()
+
     def get_tracer(self):
         """Get the configured tracer instance."""
-        return trace.get_tracer(__name__)
+        return _TRACER
 
     def shutdown(self):
-        """Properly shutdown telemetry providers."""
-        trace.get_tracer_provider().shutdown()
+        """Properly shutdown telemetry providers, draining buffered spans first."""
+        # Import here to avoid circular import (health_check imports TelemetryClient)
+        from .health_check import stop_health_metrics
+        
+        # Stop probing this client before its providers go away
+        stop_health_metrics()
+        tracer_provider = trace.get_tracer_provider()
+        # Bounded flush so a dead backend can't hold up process exit
+        if hasattr(tracer_provider, "force_flush"):
+            tracer_provider.force_flush(timeout_millis=5000)
+        tracer_provider.shutdown()
         metrics.get_meter_provider().shutdown()
+        # The default NoOpLoggerProvider (no configure_exporters()) has neither method
+        logger_provider = get_logger_provider()
+        if hasattr(logger_provider, "force_flush"):
+            logger_provider.force_flush(timeout_millis=5000)
+        if hasattr(logger_provider, "shutdown"):
+            logger_provider.shutdown()
 
     def span_pulsar_operation(self, operation: str, attributes: dict[str, Any] | None):
         """
@@ -188,9 +259,10 @@ class TelemetryClient:
     def span_cache_operation(self, operation: str, attributes: dict[str, Any] | None):
         """
         Context manager for tracing a VALKEY cache operation.
+        Cache calls are leaf operations, so this uses a detached span (see start_span_detached).
         Usage: with telemetry_client.span_cache_operation('get'):
         """
-        return self.start_span(f"cache.{operation}", attributes)
+        return self.start_span_detached(f"cache.{operation}", attributes)
 
     def span_celery_operation(self, operation: str, attributes: dict[str, Any] | None):
         """
@@ -199,7 +271,7 @@ class TelemetryClient:
         """
         return self.start_span(f"celery.{operation}", attributes)
 
-    def configure_exporters(self, span_exporter, metric_exporter=None):
+    def configure_exporters(self, span_exporter, metric_exporter=None, span_processor=None):
         """
         Configure custom exporters for traces and metrics.
         This allows external configuration for Grafana Cloud or other providers.
@@ -207,15 +279,18 @@ class TelemetryClient:
         Args:
             span_exporter: OpenTelemetry span exporter instance
             metric_exporter: Optional OpenTelemetry metric exporter instance
+            span_processor: Optional span processor already wrapping span_exporter;
+                defaults to a BatchSpanProcessor with the settings below
         """
-        # Configure trace exporter with optimized batch settings for better performance
-        span_processor = BatchSpanProcessor(
-            span_exporter,
-            max_queue_size=2048,  # Larger queue to reduce blocking
-            export_timeout_millis=1000,  # 1s export timeout
-            schedule_delay_millis=500,  # 500ms delay between exports
-            max_export_batch_size=512  # Larger batches
-        )
+        if span_processor is None:
+            # Configure trace exporter with optimized batch settings for better performance
+            span_processor = BatchSpanProcessor(
+                span_exporter,
+                max_queue_size=2048,  # Larger queue to reduce blocking
+                export_timeout_millis=1000,  # 1s export timeout
+                schedule_delay_millis=500,  # 500ms delay between exports
+                max_export_batch_size=512  # Larger batches
+            )
         trace.get_tracer_provider().add_span_processor(span_processor)
 
         # Configure metric exporter if provided
@@ -224,10 +299,13 @@ class TelemetryClient:
             try:
                 current_provider = metrics.get_meter_provider()
                 if type(current_provider).__name__ == 'NoOpMeterProvider':
-                    metrics.set_meter_provider(MeterProvider(metric_readers=[metric_reader]))
+                    metrics.set_meter_provider(
+                        MeterProvider(resource=self._resource, metric_readers=[metric_reader])
+                    )
                 else:
                     logger.warning("MeterProvider already exists, skipping metric exporter setup")
             except Exception as e:
                 logger.warning(f"Failed to configure metric exporter: {e}")
 
+        self._exporters_version += 1
         logger.info("Configured custom exporters for telemetry with optimized batching")
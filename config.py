@@ -1,6 +1,9 @@
-from app.core.config import settings
+import os
+from dataclasses import dataclass
 from typing import Optional
 
+from app.core.config import settings
+
 # Sensitive settings (should be environment-specific)
 OTEL_EXPORTER_OTLP_ENDPOINT: str = getattr(
     settings, "OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317"
@@ -15,9 +18,31 @@ OTEL_SERVICE_VERSION: str = settings.APP_VERSION  # Use from your app config
 OTEL_DEPLOYMENT_ENVIRONMENT: str = settings.ENVIRONMENT  # prod/stage/dev
 
 # Performance tuning for production:
+OTEL_BSP_MAX_QUEUE_SIZE: int = 8192  # 4x SDK default; absorbs bursts before spans are dropped
 OTEL_BSP_MAX_EXPORT_BATCH_SIZE: int = 512  # Default is good
 OTEL_BSP_SCHEDULE_DELAY: int = 5000  # ms (5s - conservative for production)
 OTEL_BSP_EXPORT_TIMEOUT: int = 30000  # ms (30s - conservative)
+# OTLP payload compression: "gzip", "deflate" or "none" (spans compress 3-10x)
+OTEL_EXPORTER_OTLP_COMPRESSION: str = str(
+    getattr(settings, "OTEL_EXPORTER_OTLP_COMPRESSION", "gzip")
+).lower()
+# Overall budget (seconds) for re-sending one failed span batch, SDK retries included
+OTEL_EXPORT_RETRY_DEADLINE_SEC: float = float(
+    getattr(settings, "OTEL_EXPORT_RETRY_DEADLINE_SEC", 30.0)
+)
+# Independent gRPC channels per signal; raise when one HTTP/2 connection caps export throughput
+OTEL_EXPORTER_CONNECTION_POOL_SIZE: int = int(
+    getattr(settings, "OTEL_EXPORTER_CONNECTION_POOL_SIZE", 1)
+)
+
+# Health check memoization: probes run at most once per TTL (seconds)
+TELEMETRY_HEALTH_TTL_SEC: float = float(
+    getattr(settings, "TELEMETRY_HEALTH_TTL_SEC", 1.0)
+)
+# Background refresh interval (seconds) for the telemetry_health_status gauge
+TELEMETRY_HEALTH_REFRESH_SEC: float = float(
+    getattr(settings, "TELEMETRY_HEALTH_REFRESH_SEC", 5.0)
+)
 
 # Sampling configuration (adjust based on volume):
 OTEL_TRACE_SAMPLER: str = "parentbased_always_on"  # Good default
@@ -30,3 +55,42 @@ OTEL_PROPAGATORS: str = "tracecontext,baggage"  # Ensure context propagation
 OTEL_RESOURCE_ATTRIBUTES: str | None = getattr(
     settings, "OTEL_RESOURCE_ATTRIBUTES", None
 )  # For additional metadata
+
+
+@dataclass(frozen=True)
+class TelemetryConfig:
+    """Environment-driven settings for the optimized setup, read once via from_env()."""
+    service_name: str = "fastapi-connect-backend"
+    service_version: str = "1.0.0"
+    environment: str = "production"
+    telemetry_enabled: bool = True
+    enable_prometheus: bool = True
+    use_managed_services: bool = False
+    tempo_endpoint: Optional[str] = None
+    tempo_username: Optional[str] = None
+    tempo_api_key: Optional[str] = None
+    tempo_metrics_path: str = "/api/push"
+    local_endpoint: str = "http://localhost:4317"
+    otlp_transport: str = "grpc"
+    otlp_compression: str = "gzip"
+    export_retry_deadline: float = OTEL_EXPORT_RETRY_DEADLINE_SEC
+
+    @classmethod
+    def from_env(cls) -> "TelemetryConfig":
+        getenv = os.getenv
+        return cls(
+            service_name=getenv("SERVICE_NAME", cls.service_name),
+            service_version=getenv("SERVICE_VERSION", cls.service_version),
+            environment=getenv("ENVIRONMENT", cls.environment),
+            telemetry_enabled=getenv("TELEMETRY_ENABLED", "true").lower() == "true",
+            enable_prometheus=getenv("ENABLE_PROMETHEUS", "true").lower() == "true",
+            use_managed_services=getenv("USE_MANAGED_SERVICES") == "true",
+            tempo_endpoint=getenv("TEMPO_EXPORTER_ENDPOINT"),
+            tempo_username=getenv("TEMPO_USERNAME"),
+            tempo_api_key=getenv("TEMPO_API_KEY"),
+            tempo_metrics_path=getenv("TEMPO_METRICS_PATH", cls.tempo_metrics_path),
+            local_endpoint=getenv("OTEL_EXPORTER_OTLP_ENDPOINT", cls.local_endpoint),
+            otlp_transport=getenv("OTLP_TRANSPORT", cls.otlp_transport).lower(),
+            otlp_compression=getenv("OTLP_COMPRESSION", cls.otlp_compression),
+            export_retry_deadline=float(getenv("OTEL_EXPORT_RETRY_DEADLINE_SEC", cls.export_retry_deadline)),
+        )
@@ -1,25 +1,85 @@
 import logging
 from functools import wraps
 import inspect
-from time import perf_counter
-from typing import Any, Callable, TypeVar, cast, get_type_hints, ForwardRef, _AnnotatedAlias
+import os
+from time import perf_counter_ns
+from typing import Any, Callable, TypeVar, cast, get_type_hints, ForwardRef
+from weakref import WeakKeyDictionary
 
 from opentelemetry import metrics, trace
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=Callable[..., Any])
 
-# Global metrics for production monitoring
-REQUEST_COUNT = metrics.get_meter(__name__).create_counter(
+# With the SDK disabled, every decorator returns the function untouched (zero per-call cost)
+_ENABLED = os.getenv("OTEL_SDK_DISABLED", "false").lower() != "true"
+
+# Resolved once; a ProxyTracer picks up the real provider lazily if it is set after import
+_TRACER = trace.get_tracer(__name__)
+
+# Global metrics for production monitoring.
+# This module is the only place these instruments are registered; import them from here
+# rather than re-creating them, or the SDK exports duplicate time series.
+_METER = metrics.get_meter(__name__)
+REQUEST_COUNT = _METER.create_counter(
     "app.request.count", unit="1", description="Total request count"
 )
-REQUEST_LATENCY = metrics.get_meter(__name__).create_histogram(
+REQUEST_LATENCY = _METER.create_histogram(
     "app.request.latency.ms", unit="ms", description="Request latency distribution"
 )
-ERROR_COUNT = metrics.get_meter(__name__).create_counter(
+ERROR_COUNT = _METER.create_counter(
     "app.error.count", unit="1", description="Total error count"
 )
 
+# Weakly keyed so memoizing a per-request closure or lambda doesn't keep it alive forever
+_sig_cache: "WeakKeyDictionary[Callable, inspect.Signature]" = WeakKeyDictionary()
+_hints_cache: "WeakKeyDictionary[Callable, dict[str, Any]]" = WeakKeyDictionary()
+
+
+def _memo(cache: WeakKeyDictionary, fn: Callable, compute: Callable[[Callable], Any]) -> Any:
+    """Return cache[fn], computing it on a miss; unhashable or non-weakrefable callables aren't cached."""
+    try:
+        return cache[fn]
+    except KeyError:
+        pass
+    except TypeError:
+        return compute(fn)
+    value = compute(fn)
+    try:
+        cache[fn] = value
+    except TypeError:
+        pass
+    return value
+
+
+def _sig_of(fn: Callable) -> inspect.Signature:
+    """Memoized inspect.signature; Signature objects are immutable so sharing is safe."""
+    return _memo(_sig_cache, fn, inspect.signature)
+
+
+def _hints_of(fn: Callable) -> dict[str, Any]:
+    """Memoized get_type_hints (with extras, falling back to without). Callers must not mutate."""
+    return _memo(_hints_cache, fn, _compute_hints)
+
+
+def _compute_hints(fn: Callable) -> dict[str, Any]:
+    try:
+        return get_type_hints(fn, include_extras=True)
+    except Exception as e:
+        # If we can't get type hints with extras, try without
+        logger.warning(f"Error getting type hints with extras: {e}")
+        try:
+            return get_type_hints(fn)
+        except Exception as e2:
+            logger.warning(f"Error getting type hints: {e2}")
+            return {}
+
+
+def _has_forward_refs(annotations: dict[str, Any]) -> bool:
+    """True if any annotation is still unresolved (string or ForwardRef)."""
+    return any(isinstance(a, (str, ForwardRef)) for a in annotations.values())
+
+
 # Helper to properly handle FastAPI dependency injection
 def preserve_fastapi_signature(wrapper_fn, original_fn):
     """
@@ -27,7 +87,7 @@ def preserve_fastapi_signature(wrapper_fn, original_fn):
     FastAPI analyzes the function signature to determine what dependencies to inject.
     """
     # Copy signature and annotations for FastAPI
-    sig = inspect.signature(original_fn)
+    sig = _sig_of(original_fn)
     wrapper_fn.__signature__ = sig
     wrapper_fn.__annotations__ = getattr(original_fn, '__annotations__', {})
     
@@ -40,13 +100,8 @@ def preserve_fastapi_signature(wrapper_fn, original_fn):
         # Preserve any pydantic Field information
         if hasattr(param, "default") and hasattr(param.default, "__pydantic_field__"):
             setattr(wrapper_fn, f"__pydantic_field_{param_name}__", param.default)
-            
-        # Special handling for path parameters
-        if param_name in wrapper_fn.__annotations__:
-            annotation = wrapper_fn.__annotations__[param_name]
-            # Handle Annotated types specifically - crucial for path parameters
-            if hasattr(annotation, "__origin__") and annotation.__origin__ is _AnnotatedAlias:
-                setattr(wrapper_fn, f"__path_param_{param_name}__", True)
+        # Annotated path parameters need no per-parameter markers: FastAPI reads them
+        # from __signature__, which is copied above.
     
     # Copy docstring
     wrapper_fn.__doc__ = original_fn.__doc__
@@ -58,24 +113,13 @@ def preserve_fastapi_signature(wrapper_fn, original_fn):
         if hasattr(original_fn, attr):
             setattr(wrapper_fn, attr, getattr(original_fn, attr))
     
-    # Copy any type annotations that might be useful for Pydantic/FastAPI
-    try:
-        type_hints = get_type_hints(original_fn, include_extras=True)
-        if type_hints:
-            for name, hint in type_hints.items():
-                if name not in wrapper_fn.__annotations__:
-                    wrapper_fn.__annotations__[name] = hint
-    except Exception as e:
-        # If we can't get type hints with extras, try without
-        logger.warning(f"Error getting type hints with extras: {e}")
-        try:
-            type_hints = get_type_hints(original_fn)
-            if type_hints:
-                for name, hint in type_hints.items():
-                    if name not in wrapper_fn.__annotations__:
-                        wrapper_fn.__annotations__[name] = hint
-        except Exception as e2:
-            logger.warning(f"Error getting type hints: {e2}")
+    # Copy any type annotations that might be useful for Pydantic/FastAPI.
+    # The __annotations__ copy above is enough unless something is still a forward
+    # reference, so only pay for get_type_hints in that case.
+    if _has_forward_refs(wrapper_fn.__annotations__):
+        for name, hint in _hints_of(original_fn).items():
+            if name not in wrapper_fn.__annotations__:
+                wrapper_fn.__annotations__[name] = hint
                 
     return wrapper_fn
 
@@ -91,23 +135,32 @@ def trace_function(
     This decorator is specifically designed to work with FastAPI routes.
     """
     def decorator(func: T) -> T:
-        # Get function signature and type hints
-        func_signature = inspect.signature(func)
+        if not _ENABLED:
+            return func
         is_async = inspect.iscoroutinefunction(func)
+        # Loop invariants: resolved once per decorated function, not per call
+        span_name = name or f"{func.__module__}.{func.__name__}"
+        span_attrs = {k: str(v) for k, v in attributes.items()} if attributes else None
+        # Metric label sets built once and reused by identity on every call. span_name is
+        # fixed at decoration time, so cardinality stays bounded by the decorated functions.
+        fn_labels = {"function": span_name}
+        status_labels = {
+            "success": {"function": span_name, "status": "success"},
+            "error": {"function": span_name, "status": "error"},
+        }
         
         if is_async:
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                span_name = name or f"{func.__module__}.{func.__name__}"
-                tracer = trace.get_tracer(__name__)
-                start_time = perf_counter()
+                start_ns = perf_counter_ns()
                 status = "success"
 
-                with tracer.start_as_current_span(span_name) as span:
+                with _TRACER.start_as_current_span(span_name) as span:
+                    # Sampled-out spans are no-ops; skip all span writes for them
+                    recording = span.is_recording()
                     try:
-                        if attributes:
-                            for k, v in attributes.items():
-                                span.set_attribute(k, str(v))
+                        if recording and span_attrs:
+                            span.set_attributes(span_attrs)
 
                         result = await func(*args, **kwargs)
                         return result
@@ -115,20 +168,21 @@ def trace_function(
                     except Exception as e:
                         status = "error"
                         if capture_exceptions:
-                            span.record_exception(e)
-                            span.set_status(trace.Status(trace.StatusCode.ERROR))
-                            ERROR_COUNT.add(1, {"function": span_name})
-                        logger.error(f"Error in {span_name}: {str(e)}", exc_info=True)
+                            if recording:
+                                span.record_exception(e)
+                                span.set_status(trace.Status(trace.StatusCode.ERROR))
+                            ERROR_COUNT.add(1, fn_labels)
+                        # No exc_info: the stack is already on the span via record_exception
+                        logger.error("Error in %s: %s", span_name, e)
                         raise
 
                     finally:
                         if record_metrics:
-                            duration = (perf_counter() - start_time) * 1000
-                            REQUEST_COUNT.add(1, {"function": span_name, "status": status})
-                            REQUEST_LATENCY.record(duration, {"function": span_name})
-                            if span.is_recording():
-                                span.set_attribute("func.duration_ms", duration)
-                                span.set_attribute("func.status", status)
+                            duration = (perf_counter_ns() - start_ns) / 1e6
+                            REQUEST_COUNT.add(1, status_labels[status])
+                            REQUEST_LATENCY.record(duration, fn_labels)
+                            if recording:
+                                span.set_attributes({"func.duration_ms": duration, "func.status": status})
             
             # Properly preserve the function signature for FastAPI
             wrapped = preserve_fastapi_signature(async_wrapper, func)
@@ -137,16 +191,15 @@ def trace_function(
         else:
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
-                span_name = name or f"{func.__module__}.{func.__name__}"
-                tracer = trace.get_tracer(__name__)
-                start_time = perf_counter()
+                start_ns = perf_counter_ns()
                 status = "success"
 
-                with tracer.start_as_current_span(span_name) as span:
+                with _TRACER.start_as_current_span(span_name) as span:
+                    # Sampled-out spans are no-ops; skip all span writes for them
+                    recording = span.is_recording()
                     try:
-                        if attributes:
-                            for k, v in attributes.items():
-                                span.set_attribute(k, str(v))
+                        if recording and span_attrs:
+                            span.set_attributes(span_attrs)
 
                         result = func(*args, **kwargs)
                         return result
@@ -154,20 +207,21 @@ def trace_function(
                     except Exception as e:
                         status = "error"
                         if capture_exceptions:
-                            span.record_exception(e)
-                            span.set_status(trace.Status(trace.StatusCode.ERROR))
-                            ERROR_COUNT.add(1, {"function": span_name})
-                        logger.error(f"Error in {span_name}: {str(e)}", exc_info=True)
+                            if recording:
+                                span.record_exception(e)
+                                span.set_status(trace.Status(trace.StatusCode.ERROR))
+                            ERROR_COUNT.add(1, fn_labels)
+                        # No exc_info: the stack is already on the span via record_exception
+                        logger.error("Error in %s: %s", span_name, e)
                         raise
 
                     finally:
                         if record_metrics:
-                            duration = (perf_counter() - start_time) * 1000
-                            REQUEST_COUNT.add(1, {"function": span_name, "status": status})
-                            REQUEST_LATENCY.record(duration, {"function": span_name})
-                            if span.is_recording():
-                                span.set_attribute("func.duration_ms", duration)
-                                span.set_attribute("func.status", status)
+                            duration = (perf_counter_ns() - start_ns) / 1e6
+                            REQUEST_COUNT.add(1, status_labels[status])
+                            REQUEST_LATENCY.record(duration, fn_labels)
+                            if recording:
+                                span.set_attributes({"func.duration_ms": duration, "func.status": status})
             
             # Properly preserve the function signature for FastAPI
             wrapped = preserve_fastapi_signature(sync_wrapper, func)
@@ -182,6 +236,8 @@ def track_errors(func: T) -> T:
     Decorator to automatically record exceptions with full context (supports sync and async).
     This decorator is specifically designed to work with FastAPI routes.
     """
+    if not _ENABLED:
+        return func
     is_async = inspect.iscoroutinefunction(func)
     
     if is_async:
@@ -194,7 +250,8 @@ def track_errors(func: T) -> T:
                 if current_span.is_recording():
                     current_span.record_exception(e)
                     current_span.set_status(trace.Status(trace.StatusCode.ERROR))
-                logger.error(f"Error in {func.__name__}: {str(e)}", exc_info=True)
+                # No exc_info: the stack is already on the span via record_exception
+                logger.error("Error in %s: %s", func.__name__, e)
                 raise
                 
         # Properly preserve the function signature for FastAPI
@@ -211,7 +268,8 @@ def track_errors(func: T) -> T:
                 if current_span.is_recording():
                     current_span.record_exception(e)
                     current_span.set_status(trace.Status(trace.StatusCode.ERROR))
-                logger.error(f"Error in {func.__name__}: {str(e)}", exc_info=True)
+                # No exc_info: the stack is already on the span via record_exception
+                logger.error("Error in %s: %s", func.__name__, e)
                 raise
                 
         # Properly preserve the function signature for FastAPI
@@ -225,18 +283,25 @@ def measure_performance(threshold_ms: float = 100.0, level: str = "warn", record
     Decorator to measure the performance of a function and log warnings for slow operations.
     This decorator is specifically designed to work with FastAPI routes.
     """
+    # Integer threshold so the common fast path never builds a float
+    threshold_ns = int(threshold_ms * 1_000_000)
+
     def decorator(func: T) -> T:
+        if not _ENABLED:
+            return func
         is_async = inspect.iscoroutinefunction(func)
+        slow_labels = {"function": func.__name__, "slow": True}
         
         if is_async:
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                start_time = perf_counter()
+                start_ns = perf_counter_ns()
                 try:
                     return await func(*args, **kwargs)
                 finally:
-                    duration = (perf_counter() - start_time) * 1000
-                    if duration > threshold_ms:
+                    elapsed_ns = perf_counter_ns() - start_ns
+                    if elapsed_ns > threshold_ns:
+                        duration = elapsed_ns / 1e6
                         msg = f"Slow performance in {func.__name__}: {duration:.2f}ms"
                         logger.log(
                             logging.ERROR if level == "error" else logging.WARNING, msg
@@ -249,7 +314,7 @@ def measure_performance(threshold_ms: float = 100.0, level: str = "warn", record
                                 "func.threshold_ms": threshold_ms,
                             })
                         if record_metric:
-                            REQUEST_LATENCY.record(duration, {"function": func.__name__, "slow": True})
+                            REQUEST_LATENCY.record(duration, slow_labels)
             
             # Properly preserve the function signature for FastAPI
             wrapped = preserve_fastapi_signature(async_wrapper, func)
@@ -258,12 +323,13 @@ def measure_performance(threshold_ms: float = 100.0, level: str = "warn", record
         else:
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
-                start_time = perf_counter()
+                start_ns = perf_counter_ns()
                 try:
                     return func(*args, **kwargs)
                 finally:
-                    duration = (perf_counter() - start_time) * 1000
-                    if duration > threshold_ms:
+                    elapsed_ns = perf_counter_ns() - start_ns
+                    if elapsed_ns > threshold_ns:
+                        duration = elapsed_ns / 1e6
                         msg = f"Slow performance in {func.__name__}: {duration:.2f}ms"
                         logger.log(
                             logging.ERROR if level == "error" else logging.WARNING, msg
@@ -276,7 +342,7 @@ def measure_performance(threshold_ms: float = 100.0, level: str = "warn", record
                                 "func.threshold_ms": threshold_ms,
                             })
                         if record_metric:
-                            REQUEST_LATENCY.record(duration, {"function": func.__name__, "slow": True})
+                            REQUEST_LATENCY.record(duration, slow_labels)
             
             # Properly preserve the function signature for FastAPI
             wrapped = preserve_fastapi_signature(sync_wrapper, func)
@@ -286,6 +352,113 @@ def measure_performance(threshold_ms: float = 100.0, level: str = "warn", record
     return decorator
 
 
+def observe(
+    name: str | None = None,
+    attributes: dict[str, Any] | None = None,
+    threshold_ms: float = 100.0,
+    level: str = "warn",
+    record_metrics: bool = True,
+) -> Callable[[T], T]:
+    """
+    Composite of trace_function, track_errors and measure_performance in one wrapper.
+    Gives a route one closure layer and one signature-preservation pass instead of three.
+    This decorator is specifically designed to work with FastAPI routes.
+    """
+    threshold_ns = int(threshold_ms * 1_000_000)
+    log_level = logging.ERROR if level == "error" else logging.WARNING
+
+    def decorator(func: T) -> T:
+        if not _ENABLED:
+            return func
+        is_async = inspect.iscoroutinefunction(func)
+        span_name = name or f"{func.__module__}.{func.__name__}"
+        span_attrs = {k: str(v) for k, v in attributes.items()} if attributes else None
+        fn_labels = {"function": span_name}
+        status_labels = {
+            "success": {"function": span_name, "status": "success"},
+            "error": {"function": span_name, "status": "error"},
+        }
+        slow_labels = {"function": func.__name__, "slow": True}
+
+        def on_error(span, recording, e):
+            if recording:
+                span.record_exception(e)
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+            ERROR_COUNT.add(1, fn_labels)
+            # No exc_info: the stack is already on the span via record_exception
+            logger.error("Error in %s: %s", span_name, e)
+
+        def on_finish(span, recording, status, elapsed_ns):
+            duration = elapsed_ns / 1e6
+            if record_metrics:
+                REQUEST_COUNT.add(1, status_labels[status])
+                REQUEST_LATENCY.record(duration, fn_labels)
+            slow = elapsed_ns > threshold_ns
+            if slow:
+                logger.log(log_level, "Slow performance in %s: %.2fms", func.__name__, duration)
+                if record_metrics:
+                    REQUEST_LATENCY.record(duration, slow_labels)
+            if recording:
+                if slow:
+                    span.set_attributes({
+                        "func.duration_ms": duration,
+                        "func.status": status,
+                        "func.slow_call": True,
+                        "func.threshold_ms": threshold_ms,
+                    })
+                else:
+                    span.set_attributes({"func.duration_ms": duration, "func.status": status})
+
+        if is_async:
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_ns = perf_counter_ns()
+                status = "success"
+
+                with _TRACER.start_as_current_span(span_name) as span:
+                    recording = span.is_recording()
+                    try:
+                        if recording and span_attrs:
+                            span.set_attributes(span_attrs)
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        status = "error"
+                        on_error(span, recording, e)
+                        raise
+                    finally:
+                        on_finish(span, recording, status, perf_counter_ns() - start_ns)
+
+            # Properly preserve the function signature for FastAPI
+            wrapped = preserve_fastapi_signature(async_wrapper, func)
+            # Also handle path parameters for routes like /{id}
+            return cast(T, preserve_path_parameters(wrapped))
+        else:
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                start_ns = perf_counter_ns()
+                status = "success"
+
+                with _TRACER.start_as_current_span(span_name) as span:
+                    recording = span.is_recording()
+                    try:
+                        if recording and span_attrs:
+                            span.set_attributes(span_attrs)
+                        return func(*args, **kwargs)
+                    except Exception as e:
+                        status = "error"
+                        on_error(span, recording, e)
+                        raise
+                    finally:
+                        on_finish(span, recording, status, perf_counter_ns() - start_ns)
+
+            # Properly preserve the function signature for FastAPI
+            wrapped = preserve_fastapi_signature(sync_wrapper, func)
+            # Also handle path parameters for routes like /{id}
+            return cast(T, preserve_path_parameters(wrapped))
+
+    return decorator
+
+
 def preserve_path_parameters(func: Callable) -> Callable:
     """
     Special handler for FastAPI path parameters.
@@ -302,7 +475,7 @@ def preserve_path_parameters(func: Callable) -> Callable:
                 func.__annotations__[param_name] = param_type
                 
         # Ensure we rebuild the signature with the correct path parameters
-        sig = inspect.signature(original)
+        sig = _sig_of(original)
         func.__signature__ = sig
         
     return func
@@ -0,0 +1,524 @@
+"""
+Pooled OTLP exporters.
+
+Each pooled exporter owns N underlying exporters, each constructing its own gRPC
+channel, and hands every export() call to the next one in round-robin order.
+Spreading batches over several HTTP/2 connections keeps a single channel's stream
+limit (e.g. a load balancer capping concurrent streams per connection) from
+capping export throughput.
+
+Each pool can be guarded by an ExportCircuitBreaker: after repeated export
+failures the breaker opens and batches are dropped immediately instead of waiting
+on a dead backend, until the recovery timeout lets a trial export through. Use
+one breaker per signal, so one failing pipeline doesn't drop the others' batches.
+
+RetryingSpanExporter re-sends failed span batches with exponential backoff under
+one overall deadline, so a transient backend error doesn't drop the batch.
+
+configure_grafana_exporters() assembles all of the above into the span and metric
+exporters for Grafana Cloud Tempo; both setup entry points build them through it.
+"""
+import base64
+import functools
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+import grpc
+from circuitbreaker import CircuitBreaker, CircuitBreakerError
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk._logs.export import LogExporter, LogExportResult
+from opentelemetry.sdk.metrics.export import MetricExporter, MetricExportResult
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .config import OTEL_EXPORT_RETRY_DEADLINE_SEC, OTEL_EXPORTER_OTLP_COMPRESSION
+
+logger = logging.getLogger(__name__)
+E = TypeVar("E")
+
+_GRPC_COMPRESSION = {
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+    "none": grpc.Compression.NoCompression,
+}
+
+
+def grpc_compression(name: str | None = None) -> grpc.Compression:
+    """Map a compression name (default: OTEL_EXPORTER_OTLP_COMPRESSION) to grpc.Compression."""
+    name = (name or OTEL_EXPORTER_OTLP_COMPRESSION).lower()
+    try:
+        return _GRPC_COMPRESSION[name]
+    except KeyError:
+        logger.warning("Unknown OTLP compression '%s', sending uncompressed", name)
+        return grpc.Compression.NoCompression
+
+
+# Keepalive pings stop idle export connections being silently dropped by load
+# balancers/NAT, which otherwise surfaces as DEADLINE_EXCEEDED on the next export
+GRPC_KEEPALIVE_OPTIONS = (
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.http2.max_pings_without_data", 0),
+)
+
+
+def keepalive_channel(
+    endpoint: str, insecure: bool = False, compression: grpc.Compression | None = None
+) -> grpc.Channel:
+    """Open a gRPC channel to endpoint's host:port with GRPC_KEEPALIVE_OPTIONS."""
+    # gRPC targets are host:port; drop any scheme and path from the OTLP endpoint
+    target = endpoint.split("://", 1)[-1].split("/", 1)[0]
+    if insecure:
+        return grpc.insecure_channel(target, options=GRPC_KEEPALIVE_OPTIONS, compression=compression)
+    return grpc.secure_channel(
+        target, grpc.ssl_channel_credentials(), options=GRPC_KEEPALIVE_OPTIONS, compression=compression
+    )
+
+
+def use_grpc_channel(exporter: E, channel: grpc.Channel) -> E:
+    """
+    Rebind an OTLP gRPC exporter onto channel, closing the one it opened itself.
+    
+    The OTLP gRPC exporters always build their own channel (there is no channel
+    argument), so this is how custom channel options or a shared connection are
+    applied. Returns exporter for use inside pool factories.
+    """
+    own_channel = exporter._channel
+    exporter._channel = channel
+    exporter._client = exporter._stub(channel)
+    if own_channel is not channel:
+        own_channel.close()
+    return exporter
+
+
+class _SharedChannel:
+    """
+    grpc.Channel proxy whose close() only takes effect once every user has closed it.
+    
+    Exporter shutdown closes the exporter's channel, so without this the first
+    exporter shut down (the tracer provider goes first) would cut off the other
+    one's final export.
+    """
+
+    def __init__(self, channel: grpc.Channel, users: int):
+        self._channel = channel
+        self._users = users
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+        self._channel.close()
+
+    def __getattr__(self, name):
+        return getattr(self._channel, name)
+
+
+def share_grpc_channel(source, target) -> None:
+    """
+    Point target OTLP gRPC exporter at source's channel and close target's own.
+    
+    Exporters for the same host would otherwise each hold a separate TLS session
+    and HTTP/2 connection. Only pair exporters with the same host:port: gRPC
+    ignores the endpoint path. Source keeps owning the channel, which is closed
+    once both exporters have been shut down.
+    """
+    shared = _SharedChannel(source._channel, users=2)
+    source._channel = shared
+    use_grpc_channel(target, shared)
+
+
+class ExportFailedError(RuntimeError):
+    """Raised inside the breaker when an exporter reports a non-success result."""
+
+
+class ExportCircuitBreaker(CircuitBreaker):
+    """
+    Circuit breaker guarding OTLP export calls (not one-shot initialization).
+    
+    The circuitbreaker counters are not locked, so each breaker should be driven
+    by a single export thread, i.e. one breaker per signal.
+    """
+
+    FAILURE_THRESHOLD = 3
+    RECOVERY_TIMEOUT = 30
+    EXPECTED_EXCEPTION = (grpc.RpcError, ConnectionError, RuntimeError)
+
+    @property
+    def is_open(self) -> bool:
+        """True while exports are being short-circuited (read by health checks)."""
+        return self.opened
+
+
+class RetryingSpanExporter(SpanExporter):
+    """
+    Span exporter that re-sends failed batches with exponential backoff until a deadline.
+    
+    The OTLP exporters already retry transient errors, but only within their own
+    timeout. This wrapper owns the overall budget instead: each attempt is one
+    inner export() bounded by attempt_timeout (SDK retries included), and a new
+    attempt only starts if it can finish before the deadline. Total time per batch
+    therefore stays under deadline rather than multiplying the two retry loops.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        attempt_timeout: float,
+        deadline: float = 30.0,
+        max_attempts: int = 5,
+        initial_backoff: float = 0.005,
+        max_backoff: float = 4.0,
+        multiplier: float = 2.0,
+    ):
+        self._exporter = exporter
+        self._attempt_timeout = attempt_timeout
+        self._deadline = deadline
+        self._max_attempts = max_attempts
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._multiplier = multiplier
+        # Set on shutdown so a pending backoff wait returns immediately
+        self._shutdown = threading.Event()
+
+    def export(self, spans):
+        give_up_at = time.monotonic() + self._deadline
+        backoff = self._initial_backoff
+        attempt = 0
+        while True:
+            attempt += 1
+            result = self._exporter.export(spans)
+            if result == SpanExportResult.SUCCESS or attempt >= self._max_attempts:
+                break
+            # Only retry if a full attempt still fits before the deadline
+            if time.monotonic() + backoff + self._attempt_timeout >= give_up_at:
+                break
+            if self._shutdown.wait(backoff):
+                break
+            backoff = min(self._max_backoff, backoff * self._multiplier)
+        if result != SpanExportResult.SUCCESS:
+            logger.debug("Span export failed after %d attempt(s)", attempt)
+        return result
+
+    def shutdown(self):
+        self._shutdown.set()
+        self._exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._exporter.force_flush(timeout_millis)
+
+
+class _ExporterPool(Generic[E]):
+    """Round-robin pool of independently connected exporters."""
+
+    _SUCCESS = None
+    _FAILURE = None
+
+    def _init_pool(
+        self,
+        factory: Callable[[], E],
+        size: int,
+        breaker: ExportCircuitBreaker | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"Exporter connection pool size must be >= 1, got {size}")
+        self._exporters: list[E] = [factory() for _ in range(size)]
+        # itertools.count().__next__ is atomic under the GIL, so no lock is needed
+        self._idx = itertools.count()
+        self._breaker = breaker
+
+    def _next_exporter(self) -> E:
+        return self._exporters[next(self._idx) % len(self._exporters)]
+
+    def _export_or_raise(self, exporter: E, *args, **kwargs):
+        result = exporter.export(*args, **kwargs)
+        if result != self._SUCCESS:
+            raise ExportFailedError(f"{type(exporter).__name__} export returned {result}")
+        return result
+
+    def _dispatch(self, *args, **kwargs):
+        exporter = self._next_exporter()
+        if self._breaker is None:
+            return exporter.export(*args, **kwargs)
+        try:
+            return self._breaker.call(self._export_or_raise, exporter, *args, **kwargs)
+        except CircuitBreakerError:
+            # Backend known to be down: drop the batch without touching the network
+            return self._FAILURE
+        except Exception as e:
+            logger.warning("Telemetry export failed: %s", e)
+            return self._FAILURE
+
+    @property
+    def exporters(self) -> tuple[E, ...]:
+        """The underlying exporters, in dispatch order."""
+        return tuple(self._exporters)
+
+
+class PooledSpanExporter(_ExporterPool[SpanExporter], SpanExporter):
+    """Span exporter that dispatches each batch to the next exporter in the pool."""
+
+    _SUCCESS = SpanExportResult.SUCCESS
+    _FAILURE = SpanExportResult.FAILURE
+
+    def __init__(
+        self,
+        factory: Callable[[], SpanExporter],
+        size: int = 1,
+        breaker: ExportCircuitBreaker | None = None,
+    ):
+        self._init_pool(factory, size, breaker)
+
+    def export(self, spans):
+        return self._dispatch(spans)
+
+    def shutdown(self):
+        for exporter in self._exporters:
+            exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return all(exporter.force_flush(timeout_millis) for exporter in self._exporters)
+
+
+class PooledMetricExporter(_ExporterPool[MetricExporter], MetricExporter):
+    """Metric exporter that dispatches each collection to the next exporter in the pool."""
+
+    _SUCCESS = MetricExportResult.SUCCESS
+    _FAILURE = MetricExportResult.FAILURE
+
+    def __init__(
+        self,
+        factory: Callable[[], MetricExporter],
+        size: int = 1,
+        breaker: ExportCircuitBreaker | None = None,
+    ):
+        self._init_pool(factory, size, breaker)
+        # Every pooled exporter is built by the same factory, so the first one's
+        # temporality/aggregation preferences apply to the whole pool
+        first = self._exporters[0]
+        MetricExporter.__init__(
+            self,
+            preferred_temporality=first._preferred_temporality,
+            preferred_aggregation=first._preferred_aggregation,
+        )
+
+    def export(self, metrics_data, timeout_millis: float = 10_000, **kwargs):
+        return self._dispatch(metrics_data, timeout_millis=timeout_millis, **kwargs)
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        return all(exporter.force_flush(timeout_millis=timeout_millis) for exporter in self._exporters)
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
+        for exporter in self._exporters:
+            exporter.shutdown(timeout_millis=timeout_millis, **kwargs)
+
+
+class PooledLogExporter(_ExporterPool[LogExporter], LogExporter):
+    """Log exporter that dispatches each batch to the next exporter in the pool."""
+
+    _SUCCESS = LogExportResult.SUCCESS
+    _FAILURE = LogExportResult.FAILURE
+
+    def __init__(
+        self,
+        factory: Callable[[], LogExporter],
+        size: int = 1,
+        breaker: ExportCircuitBreaker | None = None,
+    ):
+        self._init_pool(factory, size, breaker)
+
+    def export(self, batch):
+        return self._dispatch(batch)
+
+    def force_flush(self, timeout_millis: int = 30_000) -> bool:
+        return all(exporter.force_flush(timeout_millis=timeout_millis) for exporter in self._exporters)
+
+    def shutdown(self):
+        for exporter in self._exporters:
+            exporter.shutdown()
+
+
+def _split_endpoint(endpoint: str):
+    """urlsplit that also accepts scheme-less "host:port/path" endpoints."""
+    # Without "//" urlsplit would read "host:port" as scheme:path
+    return urlsplit(endpoint if "://" in endpoint else "//" + endpoint)
+
+
+def _with_path(endpoint: str, path: str) -> str:
+    """Return endpoint with its URL path set to path."""
+    url = urlunsplit(_split_endpoint(endpoint)._replace(path=path))
+    return url if "://" in endpoint else url[2:]
+
+
+@functools.cache
+def _basic_auth(user: str | None, key: str | None) -> tuple[tuple[str, str], ...]:
+    """Basic auth metadata for Grafana Cloud Tempo, encoded once per credential pair."""
+    # gRPC uses metadata, not headers - and expects key-value tuples
+    return (("authorization", "Basic " + base64.b64encode(f"{user}:{key}".encode()).decode()),)
+
+
+def _http_exporters(
+    endpoint: str,
+    headers,
+    pool_size: int,
+    breakers: dict[str, ExportCircuitBreaker],
+    timeout: int = 2,
+    compression: str = "gzip",
+    retry_deadline: float = OTEL_EXPORT_RETRY_DEADLINE_SEC,
+):
+    """
+    OTLP/HTTP span and metric exporters sharing one keep-alive requests.Session.
+    
+    The OTLP/HTTP paths replace endpoint's path (e.g. Tempo's /api/traces) rather
+    than being appended to it.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from opentelemetry.exporter.otlp.proto.http import Compression
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter as HTTPMetricExporter
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as HTTPSpanExporter
+
+    # Sockets (and their TLS sessions) are reused by every export batch
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False))
+    headers = dict(headers)
+    try:
+        http_compression = Compression(compression)
+    except ValueError:
+        logger.warning("Unknown OTLP compression '%s', sending uncompressed", compression)
+        http_compression = Compression.NoCompression
+
+    traces_endpoint = _with_path(endpoint, "/v1/traces")
+    metrics_endpoint = _with_path(endpoint, "/v1/metrics")
+    # The session already pools connections, so each signal needs a single exporter
+    span_exporter = PooledSpanExporter(
+        lambda: RetryingSpanExporter(
+            HTTPSpanExporter(
+                endpoint=traces_endpoint,
+                headers=headers,
+                timeout=timeout,
+                compression=http_compression,
+                session=session,
+            ),
+            attempt_timeout=timeout,
+            deadline=retry_deadline,
+        ),
+        1,
+        breakers.get("traces"),
+    )
+    metric_exporter = PooledMetricExporter(
+        lambda: HTTPMetricExporter(
+            endpoint=metrics_endpoint,
+            headers=headers,
+            timeout=timeout,
+            compression=http_compression,
+            session=session,
+        ),
+        1,
+        breakers.get("metrics"),
+    )
+    return span_exporter, metric_exporter
+
+
+def configure_grafana_exporters(
+    endpoint: str | None,
+    user: str | None,
+    key: str | None,
+    pool_size: int = 1,
+    breakers: dict[str, ExportCircuitBreaker] | None = None,
+    timeout: int = 2,
+    transport: str = "grpc",
+    compression: str | None = None,
+    traces_path: str = "/api/traces",
+    metrics_path: str = "/api/push",
+    retry_deadline: float = OTEL_EXPORT_RETRY_DEADLINE_SEC,
+):
+    """
+    Span and metric exporters for Grafana Cloud Tempo, authenticated with Basic auth.
+
+    Args:
+        endpoint: Tempo OTLP endpoint (TEMPO_EXPORTER_ENDPOINT)
+        user: Grafana Cloud username
+        key: Grafana Cloud API key
+        pool_size: Exporters (gRPC channels) per signal
+        breakers: Per-signal breakers keyed "traces"/"metrics" (e.g. TelemetryClient.circuit_breakers)
+        timeout: Per-attempt export timeout in seconds
+        transport: "grpc", or "http" for OTLP/protobuf over a keep-alive requests.Session
+        compression: "gzip", "deflate" or "none" (default: OTEL_EXPORTER_OTLP_COMPRESSION)
+        traces_path: Expected path of endpoint; a mismatch is logged
+        metrics_path: Path metrics are pushed to on endpoint's host (gRPC only)
+        retry_deadline: Overall budget in seconds for re-sending one failed span batch
+
+    Returns:
+        (span_exporter, metric_exporter)
+    """
+    if not endpoint or not user or not key:
+        logger.warning(
+            "Grafana Cloud credentials not properly configured "
+            "(TEMPO_EXPORTER_ENDPOINT set=%s, TEMPO_USERNAME set=%s, TEMPO_API_KEY set=%s)",
+            bool(endpoint), bool(user), bool(key),
+        )
+
+    headers = _basic_auth(user, key)
+    breakers = breakers or {}
+    compression = (compression or OTEL_EXPORTER_OTLP_COMPRESSION).lower()
+
+    if transport == "http":
+        return _http_exporters(endpoint, headers, pool_size, breakers, timeout, compression, retry_deadline)
+
+    # gzip shrinks repetitive span payloads 3-10x on the WAN link; compression="none" disables
+    channel_compression = grpc_compression(compression)
+
+    # Each batch goes to the next exporter (and gRPC channel) in the pool; channels
+    # are opened with keepalive so idle connections aren't dropped between flushes,
+    # and failed span batches are re-sent with backoff until retry_deadline.
+    grpc_span_exporters = []
+
+    def span_member():
+        exporter = use_grpc_channel(
+            OTLPSpanExporter(
+                endpoint=endpoint,
+                headers=headers,
+                timeout=timeout,
+                insecure=False,  # Use secure connection for Grafana Cloud
+                compression=channel_compression,
+            ),
+            keepalive_channel(endpoint, compression=channel_compression),
+        )
+        grpc_span_exporters.append(exporter)
+        return RetryingSpanExporter(exporter, attempt_timeout=timeout, deadline=retry_deadline)
+
+    span_exporter = PooledSpanExporter(span_member, pool_size, breakers.get("traces"))
+
+    # Metrics go to the same host under an explicit path
+    if endpoint and _split_endpoint(endpoint).path != traces_path:
+        logger.warning(
+            "TEMPO_EXPORTER_ENDPOINT path is not %s; metrics still go to %s",
+            traces_path, metrics_path,
+        )
+    metrics_endpoint = _with_path(endpoint, metrics_path) if endpoint else None
+    logger.debug("Metrics endpoint: %s", metrics_endpoint)
+
+    # Same host:port (gRPC drops the path), so metric pool member i reuses span
+    # member i's TLS connection instead of opening its own
+    span_sources = iter(grpc_span_exporters)
+
+    def metric_member():
+        exporter = OTLPMetricExporter(
+            endpoint=metrics_endpoint,
+            headers=headers,
+            timeout=timeout,
+            insecure=False,  # Use secure connection for Grafana Cloud
+            compression=channel_compression,
+        )
+        share_grpc_channel(next(span_sources), exporter)
+        return exporter
+
+    metric_exporter = PooledMetricExporter(metric_member, pool_size, breakers.get("metrics"))
+    return span_exporter, metric_exporter
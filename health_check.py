@@ -7,62 +7,234 @@ Includes checks for:
 - Resource utilization
 """
 import logging
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Optional
 
 from fastapi import Response, status
 from fastapi.responses import JSONResponse
 from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+# orjson serializes straight to bytes and is several times faster than stdlib json;
+# fall back to JSONResponse if it isn't installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as HealthResponse
+except ImportError:
+    HealthResponse = JSONResponse
 
 from .client import TelemetryClient
+from .config import TELEMETRY_HEALTH_REFRESH_SEC, TELEMETRY_HEALTH_TTL_SEC
 
 logger = logging.getLogger(__name__)
 
 
-def check_telemetry_health(client: Optional[TelemetryClient] = None) -> dict[str, str]:
+@dataclass(frozen=True)
+class _HealthCache:
+    """Last health probe result; swapped as a whole so readers never see a torn entry."""
+    client: Optional[TelemetryClient] = None
+    # client._exporters_version the entry was probed at; reconfiguration invalidates it
+    version: int = 0
+    expiry: float = 0.0
+    # Read-only view shared by every caller within the TTL (see _freeze)
+    result: Optional[Mapping[str, Any]] = None
+    numeric: float = 0.0
+    # Rendered /health/telemetry response, so cached_health_response() skips the JSON encode
+    status_code: int = status.HTTP_200_OK
+    body: bytes = b""
+
+
+_health_cache = _HealthCache()
+_health_lock = threading.Lock()
+# Guards registration state so stop_health_metrics() can't race a concurrent register
+_health_metrics_lock = threading.Lock()
+# telemetry_health_status instrument; created once, the SDK rejects a duplicate registration
+_health_gauge = None
+
+# Latest numeric health for the gauge, written only by the refresh thread; a plain
+# float rebind is atomic under the GIL, so the metrics callback reads it lock-free
+_HEALTH_STATUS_NUMERIC: float = 0.0
+# Running refresh thread (None when stopped) and its stop event; each thread gets a fresh one
+_health_refresh_thread: Optional[threading.Thread] = None
+_health_refresh_stop: Optional[threading.Event] = None
+
+
+class _HealthProbe(NamedTuple):
+    """Capabilities of a client resolved once, so health checks skip hasattr/callable."""
+    version: int
+    # (signal, breaker) pairs; a client with a single circuit_breaker reports it as "export"
+    circuit_breakers: tuple[tuple[str, Any], ...]
+    # None when the client has no exporters mapping (no "exporters" key in the result)
+    exporters: Optional[tuple[tuple[str, Callable[[], bool]], ...]]
+
+
+def _compile_probe(client: TelemetryClient) -> _HealthProbe:
+    """Resolve the client's circuit breakers and exporter health callables once."""
+    breakers = getattr(client, "circuit_breakers", None)
+    if not isinstance(breakers, dict):
+        breaker = getattr(client, "circuit_breaker", None)
+        breakers = {} if breaker is None else {"export": breaker}
+    exporters = getattr(client, "exporters", None)
+    checks = None
+    if exporters:
+        checks = tuple(
+            (name, exporter.is_healthy)
+            for name, exporter in exporters.items()
+            if callable(getattr(exporter, "is_healthy", None))
+        )
+    return _HealthProbe(getattr(client, "_exporters_version", 0), tuple(breakers.items()), checks)
+
+
+def _probe_for(client: TelemetryClient) -> _HealthProbe:
+    """Return the client's compiled probe, rebuilding it if its exporters changed."""
+    probe = getattr(client, "_health_probe", None)
+    if not isinstance(probe, _HealthProbe) or probe.version != getattr(client, "_exporters_version", 0):
+        probe = _compile_probe(client)
+        client._health_probe = probe
+    return probe
+
+
+def _reset_health_cache(client: Optional[TelemetryClient] = None) -> None:
+    """Drop the memoized health result, and client's compiled probe if given (tests, reconfiguration)."""
+    global _health_cache
+    _health_cache = _HealthCache()
+    if client is not None:
+        vars(client).pop("_health_probe", None)
+
+
+def _cached_health(client: TelemetryClient) -> _HealthCache:
+    """Return a fresh cache entry for client, probing at most once per TTL across threads."""
+    global _health_cache
+    cache = _health_cache
+    version = getattr(client, "_exporters_version", 0)
+    if cache.client is client and cache.version == version and cache.expiry > time.monotonic():
+        return cache
+    with _health_lock:
+        # Another thread may have refreshed the entry while we waited on the lock
+        cache = _health_cache
+        now = time.monotonic()
+        if cache.client is client and cache.version == version and cache.expiry > now:
+            return cache
+        result = _probe_health(client)
+        status_code = _health_status_code(result)
+        cache = _HealthCache(
+            client=client,
+            version=version,
+            expiry=now + TELEMETRY_HEALTH_TTL_SEC,
+            result=_freeze(result),
+            numeric=_status_numeric(result.get("status", "unhealthy")),
+            status_code=status_code,
+            body=HealthResponse(content=result, status_code=status_code).body,
+        )
+        _health_cache = cache
+        return cache
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only view of a health result (nested mappings included); no copy is made."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Plain-dict copy of a (possibly frozen) health result, for JSON encoders."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+# Gauge encoding of health statuses; anything else (unhealthy, unknown) is 0.0
+_STATUS_NUM = {"healthy": 2.0, "degraded": 1.0}
+
+
+def _status_numeric(status: str) -> float:
+    return _STATUS_NUM.get(status, 0.0)
+
+
+# Shared answer (and pre-rendered body) while setup_telemetry() hasn't run yet
+_UNINITIALIZED = _freeze({"status": "uninitialized", "reason": "Telemetry client not initialized"})
+_UNINITIALIZED_BODY = HealthResponse(
+    content=_thaw(_UNINITIALIZED), status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+).body
+
+
+def _active_client() -> Optional[TelemetryClient]:
+    """The global TelemetryClient, or None before setup_telemetry() has run."""
+    # Import here to avoid circular import
+    from .telemetry import get_telemetry
+    try:
+        return get_telemetry()
+    except RuntimeError:
+        return None
+
+
+def _health_status_code(health: Mapping[str, Any]) -> int:
+    """200 for healthy and degraded (with warning content); 503 for unhealthy, uninitialized or unknown."""
+    if health["status"] in _STATUS_NUM:
+        return status.HTTP_200_OK
+    return status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def check_telemetry_health(client: Optional[TelemetryClient] = None) -> Mapping[str, Any]:
     """
     Comprehensive health check for telemetry system.
+    Results are memoized for TELEMETRY_HEALTH_TTL_SEC and shared between callers as
+    a read-only mapping, so one caller can't alter what the others see.
     
     Args:
         client: Optional TelemetryClient instance (will use global if None)
         
     Returns:
-        dict with health status and details
+        Read-only mapping with health status and details
     """
-    # Import here to avoid circular import
     if client is None:
-        from .telemetry import get_telemetry
-        client = get_telemetry()
+        client = _active_client()
         
     # If still None, telemetry is not initialized
     if client is None:
         logger.warning("Telemetry health check called but client is not initialized")
-        return {"status": "unhealthy", "reason": "Telemetry client not initialized"}
+        return _UNINITIALIZED
 
+    return _cached_health(client).result
+
+
+def _probe_health(client: TelemetryClient) -> dict[str, Any]:
+    """Run the actual (uncached) health probe against client."""
+    probe = _probe_for(client)
     health_status = {"status": "healthy", "circuit_breaker": "closed"}
     
-    # Check circuit breaker state
-    if hasattr(client, "circuit_breaker") and client.circuit_breaker.is_open:
-        health_status.update({
-            "status": "degraded",
-            "circuit_breaker": "open",
-            "reason": "Telemetry backend unavailable"
-        })
+    # Check the exporter circuit breakers (each opens after repeated OTLP export failures)
+    if probe.circuit_breakers:
+        breaker_states = {
+            name: "open" if breaker.is_open else "closed" for name, breaker in probe.circuit_breakers
+        }
+        health_status["circuit_breakers"] = breaker_states
+        open_signals = [name for name, state in breaker_states.items() if state == "open"]
+        if open_signals:
+            health_status.update({
+                "status": "degraded",
+                "circuit_breaker": "open",
+                "reason": f"Telemetry backend unavailable ({', '.join(open_signals)})"
+            })
     
     # Check exporter health if available
-    if hasattr(client, "exporters") and client.exporters:
+    if probe.exporters is not None:
         exporters_status = {}
         all_healthy = True
         
-        for name, exporter in client.exporters.items():
-            if hasattr(exporter, "is_healthy") and callable(exporter.is_healthy):
-                try:
-                    is_healthy = exporter.is_healthy()
-                    exporters_status[name] = "healthy" if is_healthy else "unhealthy"
-                    all_healthy = all_healthy and is_healthy
-                except Exception as e:
-                    logger.exception(f"Error checking health of exporter {name}")
-                    exporters_status[name] = f"error: {str(e)}"
-                    all_healthy = False
+        for name, is_healthy_check in probe.exporters:
+            try:
+                is_healthy = is_healthy_check()
+                exporters_status[name] = "healthy" if is_healthy else "unhealthy"
+                all_healthy = all_healthy and is_healthy
+            except Exception as e:
+                logger.exception(f"Error checking health of exporter {name}")
+                exporters_status[name] = f"error: {str(e)}"
+                all_healthy = False
         
         if not all_healthy:
             health_status["status"] = "degraded"
@@ -77,25 +249,32 @@ def health_response() -> Response:
     """
     Generate FastAPI response for telemetry health check.
     """
-    from .telemetry import get_telemetry
-    
-    # Use the global telemetry client
-    client = get_telemetry()
-    health = check_telemetry_health(client)
+    # Use the global telemetry client (uninitialized before setup)
+    health = check_telemetry_health()
     
-    # Determine status code based on health status
-    status_code = status.HTTP_200_OK
-    if health["status"] == "unhealthy":
-        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-    elif health["status"] == "degraded":
-        status_code = status.HTTP_200_OK  # Degraded is still 200 but with warning content
-    
-    return JSONResponse(
-        content=health,
-        status_code=status_code,
+    return HealthResponse(
+        content=_thaw(health),
+        status_code=_health_status_code(health),
     )
 
 
+def cached_health_response() -> Response:
+    """
+    health_response() served from the memoized health entry's pre-rendered body,
+    so frequent load-balancer probes cost a bytes copy instead of a probe + JSON encode.
+    The body expires and follows client reconfiguration together with the entry.
+    """
+    client = _active_client()
+    if client is None:
+        return Response(
+            content=_UNINITIALIZED_BODY,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            media_type="application/json",
+        )
+    cache = _cached_health(client)
+    return Response(content=cache.body, status_code=cache.status_code, media_type="application/json")
+
+
 def get_health_status_numeric(client: Optional[TelemetryClient] = None) -> float:
     """
     Convert health status to a numeric value for metrics.
@@ -105,44 +284,100 @@ def get_health_status_numeric(client: Optional[TelemetryClient] = None) -> float
         1.0 for degraded
         0.0 for unhealthy/uninitialized
     """
-    health = check_telemetry_health(client)
-    status = health.get("status", "unhealthy")
-    
-    if status == "healthy":
-        return 2.0
-    elif status == "degraded":
-        return 1.0
-    else:
+    if client is None:
+        client = _active_client()
+    if client is None:
         return 0.0
+    # The numeric form is cached alongside the dict, so no status string comparison here
+    return _cached_health(client).numeric
+
+
+def _refresh_health_status(
+    get_client: Callable[[], TelemetryClient], interval: float, stop: threading.Event
+) -> None:
+    """Recompute _HEALTH_STATUS_NUMERIC every interval seconds until stop is set."""
+    global _HEALTH_STATUS_NUMERIC
+    while True:
+        try:
+            numeric = get_health_status_numeric(get_client())
+        except Exception:
+            # Uninitialized client or a failing probe both report as unhealthy
+            logger.debug("Telemetry health refresh failed", exc_info=True)
+            numeric = 0.0
+        # Stopped mid-probe: don't overwrite the value stop_health_metrics() reset
+        if stop.is_set():
+            return
+        _HEALTH_STATUS_NUMERIC = numeric
+        if stop.wait(interval):
+            return
 
 
-def register_health_metrics():
+def register_health_metrics(get_client: Optional[Callable[[], TelemetryClient]] = None):
     """
     Register health-related metrics for monitoring.
+    
+    Args:
+        get_client: Returns the active TelemetryClient; bound once here so the refresh
+            loop never re-imports it (defaults to the global client, None before setup)
+    
+    Call this once telemetry exporters are configured (setup_optimized_telemetry
+    does); repeated calls are ignored until stop_health_metrics() is called.
+    
+    Health is probed by a daemon thread every TELEMETRY_HEALTH_REFRESH_SEC, so the
+    gauge callback running on the metrics export thread never blocks on exporters.
     """
+    global _health_gauge, _health_refresh_thread, _health_refresh_stop
+    with _health_metrics_lock:
+        if _health_refresh_thread is not None:
+            return
+        
+        if get_client is None:
+            get_client = _active_client
+        
+        stop = _health_refresh_stop = threading.Event()
+        _health_refresh_thread = threading.Thread(
+            target=_refresh_health_status,
+            args=(get_client, TELEMETRY_HEALTH_REFRESH_SEC, stop),
+            name="telemetry-health-refresh",
+            daemon=True,
+        )
+        _health_refresh_thread.start()
+        
+        # The gauge outlives stop/register cycles; its callback always reads the latest value
+        if _health_gauge is None:
+            _health_gauge = _create_health_gauge()
+
+
+def _create_health_gauge():
     meter = metrics.get_meter(__name__)
     
-    # Define callback that returns a simple numeric value
+    # Constant time: only reads the value the refresh thread last published
     def health_callback(_):
         """Returns current telemetry health status as a numeric value."""
-        try:
-            # Import here to avoid circular import
-            from .telemetry import get_telemetry
-            
-            # Get the global telemetry client
-            client = get_telemetry()
-            status_value = get_health_status_numeric(client)
-            
-            # Return a simple numeric value (not a tuple)
-            return status_value
-        except Exception as e:
-            logging.exception("Error in health metrics callback")
-            return 0.0  # Return unhealthy on error
+        return (Observation(_HEALTH_STATUS_NUMERIC),)
     
     # Create observable gauge with callbacks parameter (list of callbacks)
-    meter.create_observable_gauge(
+    return meter.create_observable_gauge(
         name="telemetry_health_status",
         description="Telemetry health status (2=healthy, 1=degraded, 0=unhealthy)",
         unit="status",
         callbacks=[health_callback]  # Use callbacks (list) instead of callback (single function)
-    )
\ No newline at end of file
+    )
+
+
+def stop_health_metrics() -> None:
+    """
+    Stop the health refresh thread and allow register_health_metrics() to run again.
+    
+    Called by TelemetryClient.shutdown(); safe to call when nothing is registered.
+    The gauge itself stays registered and reports 0 until the thread is restarted.
+    """
+    global _health_refresh_thread, _health_refresh_stop, _HEALTH_STATUS_NUMERIC
+    with _health_metrics_lock:
+        thread, stop = _health_refresh_thread, _health_refresh_stop
+        _health_refresh_thread = _health_refresh_stop = None
+        if thread is not None:
+            stop.set()
+            # Bounded: a probe stuck on a dead exporter must not hang shutdown
+            thread.join(timeout=TELEMETRY_HEALTH_REFRESH_SEC)
+        _HEALTH_STATUS_NUMERIC = 0.0
@@ -13,7 +13,8 @@ Key improvements:
 - Parallel operation tracing
 """
 
-import os
+import logging
+import sys
 import time
 import uuid
 from typing import Optional
@@ -25,14 +26,34 @@ from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExp
 from opentelemetry import trace
 
 from .client import TelemetryClient
+from .config import TelemetryConfig
 from .decorators import measure_performance, trace_function, track_errors
-from .health_check import health_response
+from .exporters import configure_grafana_exporters, share_grpc_channel
+from .health_check import health_response, register_health_metrics
+
+logger = logging.getLogger(__name__)
 
 # Initialize at module level for easy access
 telemetry_client: Optional[TelemetryClient] = None
 
+# Resolved once; a ProxyTracer binds to the real provider on first span if it is installed later
+_TRACER = trace.get_tracer(__name__)
+
+# Root-span attribute keys, interned once and shared by every request
+_HTTP_METHOD = sys.intern("http.method")
+_HTTP_URL = sys.intern("http.url")
+_HTTP_SCHEME = sys.intern("http.scheme")
+_HTTP_HOST = sys.intern("http.host")
+_HTTP_TARGET = sys.intern("http.target")
+_HTTP_QUERY = sys.intern("http.query")
+_HTTP_USER_AGENT = sys.intern("http.user_agent")
+_REQUEST_ID = sys.intern("request.id")
+_HTTP_STATUS_CODE = sys.intern("http.status_code")
+_HTTP_RESPONSE_SIZE = sys.intern("http.response.size")
+_HTTP_DURATION_MS = sys.intern("http.duration_ms")
 
-def setup_optimized_telemetry(app: FastAPI) -> TelemetryClient:
+
+def setup_optimized_telemetry(app: FastAPI, config: Optional[TelemetryConfig] = None) -> TelemetryClient:
     """
     Optimized telemetry setup that fixes service name issues and trace gaps.
     
@@ -44,6 +65,7 @@ def setup_optimized_telemetry(app: FastAPI) -> TelemetryClient:
     
     Args:
         app: FastAPI application instance
+        config: Settings to use; read from the environment when omitted
 
     Returns:
         Configured TelemetryClient instance
@@ -51,14 +73,15 @@ def setup_optimized_telemetry(app: FastAPI) -> TelemetryClient:
     global telemetry_client
 
     # Get service configuration
-    service_name = os.getenv("SERVICE_NAME", "fastapi-connect-backend")
-    service_version = os.getenv("SERVICE_VERSION", "1.0.0")
-    environment = os.getenv("ENVIRONMENT", "production")
+    config = config or TelemetryConfig.from_env()
+    service_name = config.service_name
+    service_version = config.service_version
+    environment = config.environment
     
     # Create unique instance ID for better tracing
     instance_id = f"{service_name}-{uuid.uuid4().hex[:8]}"
     
-    print(f"[TELEMETRY] Initializing optimized telemetry for {service_name} (instance: {instance_id})")
+    logger.info("Initializing optimized telemetry for %s (instance: %s)", service_name, instance_id)
 
     # Initialize OpenTelemetry client with explicit configuration
     telemetry_client = TelemetryClient(
@@ -70,75 +93,52 @@ def setup_optimized_telemetry(app: FastAPI) -> TelemetryClient:
     )
 
     # Configure OTLP exporter for Grafana Cloud Tempo
-    if os.getenv("USE_MANAGED_SERVICES") == "true":
-        print("[TELEMETRY] Configuring Grafana Cloud Tempo integration", flush=True)
+    if config.use_managed_services:
+        logger.info("Configuring Grafana Cloud Tempo integration")
         # Grafana Cloud configuration
-        otlp_endpoint = os.getenv("TEMPO_EXPORTER_ENDPOINT")
-        tempo_username = os.getenv("TEMPO_USERNAME")  
-        tempo_api_key = os.getenv("TEMPO_API_KEY")
-        
-        print(f"[TELEMETRY] Service: {service_name}")
-        print(f"[TELEMETRY] Instance: {instance_id}")
-        print(f"[TELEMETRY] Environment: {environment}")
-        print(f"[TELEMETRY] Endpoint: {otlp_endpoint}")
-        print(f"[TELEMETRY] Username: {tempo_username}")
-        print(f"[TELEMETRY] API Key: {'✓' if tempo_api_key else '✗'}")
-        
-        if not otlp_endpoint or not tempo_username or not tempo_api_key:
-            print("[WARNING] Grafana Cloud credentials not properly configured", flush=True)
-            print("  TEMPO_EXPORTER_ENDPOINT:", "✓" if otlp_endpoint else "✗")
-            print("  TEMPO_USERNAME:", "✓" if tempo_username else "✗")
-            print("  TEMPO_API_KEY:", "✓" if tempo_api_key else "✗")
-        
-        # Use basic authentication for Grafana Cloud Tempo (gRPC metadata format)
-        import base64
-        credentials = f"{tempo_username}:{tempo_api_key}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        # gRPC uses metadata, not headers - and expects key-value tuples
-        headers = (
-            ("authorization", f"Basic {encoded_credentials}"),
-        )
+        otlp_endpoint = config.tempo_endpoint
+        tempo_username = config.tempo_username
+        tempo_api_key = config.tempo_api_key
         
-        span_exporter = OTLPSpanExporter(
-            endpoint=otlp_endpoint,
-            headers=headers,
-            timeout=30,
-            insecure=False  # Use secure connection for Grafana Cloud
+        logger.info(
+            "Tempo exporter: service=%s instance=%s environment=%s endpoint=%s username=%s api_key=%s",
+            service_name, instance_id, environment, otlp_endpoint, tempo_username,
+            "set" if tempo_api_key else "missing",
         )
         
-        # Also configure metrics exporter for Grafana Cloud
-        metrics_endpoint = otlp_endpoint.replace("/api/traces", "/api/push")
-        print(f"[TELEMETRY] Metrics endpoint: {metrics_endpoint}", flush=True)
-        metric_exporter = OTLPMetricExporter(
-            endpoint=metrics_endpoint,
-            headers=headers,
+        # Same exporter construction as setup_telemetry() (auth, compression, keepalive, breaker)
+        span_exporter, metric_exporter = configure_grafana_exporters(
+            otlp_endpoint, tempo_username, tempo_api_key,
+            breakers=telemetry_client.circuit_breakers,
             timeout=30,
-            insecure=False  # Use secure connection for Grafana Cloud
+            transport=config.otlp_transport,
+            compression=config.otlp_compression,
+            metrics_path=config.tempo_metrics_path,
+            retry_deadline=config.export_retry_deadline,
         )
         
-        print("[TELEMETRY] Grafana Cloud exporters configured with Basic Auth", flush=True)
+        logger.info("Grafana Cloud exporters configured with Basic Auth")
     else:
-        print("[TELEMETRY] Using local Tempo setup", flush=True)
+        logger.info("Using local Tempo setup")
         # Local Tempo setup
-        local_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
+        local_endpoint = config.local_endpoint
         span_exporter = OTLPSpanExporter(endpoint=local_endpoint)
         metric_exporter = OTLPMetricExporter(endpoint=local_endpoint)
+        share_grpc_channel(span_exporter, metric_exporter)
     
     # Configure telemetry client with the exporters BEFORE FastAPI instrumentation
     telemetry_client.configure_exporters(span_exporter, metric_exporter)
+    # Register the health gauge against the meter provider configured above
+    register_health_metrics(get_telemetry)
     
-    # Add root span middleware BEFORE other middleware
-    add_root_span_middleware(app)
-    
-    # Add comprehensive tracing middleware
-    add_comprehensive_tracing_middleware(app)
+    # Add root span middleware (also emits the request_processing span)
+    add_root_span_middleware(app, config)
     
     # Instrument FastAPI with OpenTelemetry AFTER middleware setup
     telemetry_client.instrument_fastapi(app)
     
     # Add Prometheus instrumentation if enabled (will use same prometheus_client)
-    if os.getenv("ENABLE_PROMETHEUS", "true").lower() == "true":
+    if config.enable_prometheus:
         try:
             from prometheus_fastapi_instrumentator import Instrumentator
             
@@ -156,129 +156,164 @@ def setup_optimized_telemetry(app: FastAPI) -> TelemetryClient:
             async def expose_metrics():
                 instrumentator.expose(app)
         except ImportError:
-            print("[WARNING] prometheus_fastapi_instrumentator not available", flush=True)
+            logger.warning("prometheus_fastapi_instrumentator not available")
     
-    print(f"[TELEMETRY] Optimized telemetry initialized successfully for {service_name}")
+    logger.info("Optimized telemetry initialized successfully for %s", service_name)
     return telemetry_client
 
 
-def add_root_span_middleware(app: FastAPI):
+def _hostname(netloc: str) -> str:
+    """Strip the port from a Host header value ("[::1]:8000" -> "::1")."""
+    if netloc.startswith("["):
+        return netloc[1:netloc.find("]")]
+    return netloc.partition(":")[0]
+
+
+def add_root_span_middleware(app: FastAPI, config: Optional[TelemetryConfig] = None):
     """
     Add middleware to create proper root spans for all requests.
     This fixes the '<root span not yet received>' issue.
+    
+    The same middleware also opens the request_processing child span, so the
+    whole span tree costs a single await call_next per request.
+    
+    Nothing is installed when TELEMETRY_ENABLED=false or the global tracer
+    provider is the no-op one, since every span would be discarded anyway.
     """
+    config = config or TelemetryConfig.from_env()
+    if (
+        not config.telemetry_enabled
+        or isinstance(trace.get_tracer_provider(), trace.NoOpTracerProvider)
+    ):
+        return
+    
     @app.middleware("http")
     async def root_span_middleware(request: Request, call_next):
         """Create a root span for each request to ensure proper trace hierarchy."""
-        tracer = trace.get_tracer(__name__)
+        start_ns = time.perf_counter_ns()
+        scope = request.scope
+        
+        # One pass over the raw ASGI headers (keys are already lowercase bytes)
+        user_agent = request_id = host = None
+        content_type = b"unknown"
+        content_length = b"0"
+        for key, value in scope["headers"]:
+            if key == b"user-agent":
+                user_agent = value
+            elif key == b"x-request-id":
+                request_id = value
+            elif key == b"content-type":
+                content_type = value
+            elif key == b"content-length":
+                content_length = value
+            elif key == b"host":
+                host = value
         
         # Create root span with request information
-        span_name = f"{request.method} {request.url.path}"
+        method = scope["method"]
+        path = scope["path"]
+        span_name = "%s %s" % (method, path)
         
-        with tracer.start_as_current_span(span_name) as span:
-            # Set span attributes for better observability
-            span.set_attribute("http.method", request.method)
-            span.set_attribute("http.url", str(request.url))
-            span.set_attribute("http.scheme", request.url.scheme)
-            span.set_attribute("http.host", request.url.hostname or "unknown")
-            span.set_attribute("http.target", request.url.path)
-            
-            # Add query parameters if present
-            if request.query_params:
-                span.set_attribute("http.query", str(request.query_params))
-            
-            # Add user agent if available
-            user_agent = request.headers.get("user-agent")
-            if user_agent:
-                span.set_attribute("http.user_agent", user_agent)
-            
-            # Add request ID for correlation
-            request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-            span.set_attribute("request.id", request_id)
-            
-            start_time = time.time()
-            
-            try:
-                # Process the request
-                response = await call_next(request)
-                
-                # Set response attributes
-                span.set_attribute("http.status_code", response.status_code)
-                span.set_attribute("http.response.size", 
-                                 response.headers.get("content-length", "unknown"))
-                
-                # Set span status based on HTTP status
-                if response.status_code >= 400:
-                    span.set_status(trace.Status(trace.StatusCode.ERROR))
+        with _TRACER.start_as_current_span(span_name) as span:
+            # Non-recording (unsampled) spans drop attributes anyway, so skip building them
+            recording = span.is_recording()
+            if recording:
+                # URL parts straight from the ASGI scope, without building a starlette URL
+                scheme = scope.get("scheme", "http")
+                if host:
+                    netloc = host.decode("latin-1")
                 else:
-                    span.set_status(trace.Status(trace.StatusCode.OK))
+                    server = scope.get("server")
+                    if not server:
+                        netloc = "unknown"
+                    elif server[1] is None:
+                        # Unix socket: ASGI reports (path, None), there is no port
+                        netloc = server[0]
+                    elif ":" in server[0]:
+                        # IPv6 literal; bracketed so _hostname() can find the port
+                        netloc = "[%s]:%s" % server
+                    else:
+                        netloc = "%s:%s" % server
+                query = scope.get("query_string", b"").decode("latin-1")
+                url = "%s://%s%s" % (scheme, netloc, path)
                 
-                return response
+                # Set span attributes for better observability
+                span.set_attribute(_HTTP_METHOD, method)
+                span.set_attribute(_HTTP_URL, "%s?%s" % (url, query) if query else url)
+                span.set_attribute(_HTTP_SCHEME, scheme)
+                span.set_attribute(_HTTP_HOST, _hostname(netloc))
+                span.set_attribute(_HTTP_TARGET, path)
                 
-            except Exception as e:
-                # Record exception in span
-                span.record_exception(e)
-                span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
-                raise
-            
-            finally:
-                # Record request duration
-                duration = time.time() - start_time
-                span.set_attribute("http.duration_ms", duration * 1000)
-
-
-def add_comprehensive_tracing_middleware(app: FastAPI):
-    """
-    Add middleware for comprehensive request tracing to eliminate gaps.
-    """
-    @app.middleware("http")
-    async def comprehensive_tracing_middleware(request: Request, call_next):
-        """Add detailed tracing for request processing stages."""
-        tracer = trace.get_tracer(__name__)
-        
-        # Get current span (should be the root span from previous middleware)
-        root_span = trace.get_current_span()
-        
-        with tracer.start_as_current_span("request_processing") as processing_span:
-            processing_span.set_attribute("stage", "middleware")
-            
-            # Trace request parsing
-            with tracer.start_as_current_span("request_parsing") as parse_span:
-                parse_start = time.time()
-                
-                # Parse request details
-                content_type = request.headers.get("content-type", "unknown")
-                content_length = request.headers.get("content-length", "0")
+                # Add query parameters if present
+                if query:
+                    span.set_attribute(_HTTP_QUERY, query)
                 
-                parse_span.set_attribute("http.content_type", content_type)
-                parse_span.set_attribute("http.content_length", content_length)
+                # Add user agent if available
+                if user_agent:
+                    span.set_attribute(_HTTP_USER_AGENT, user_agent.decode("latin-1"))
                 
-                # Check if this is a JSON request
-                if "application/json" in content_type:
-                    parse_span.set_attribute("request.format", "json")
-                
-                parse_duration = time.time() - parse_start
-                parse_span.set_attribute("parsing.duration_ms", parse_duration * 1000)
-            
-            # Process the request with timing
-            process_start = time.time()
+                # Add request ID for correlation
+                span.set_attribute(
+                    _REQUEST_ID,
+                    request_id.decode("latin-1") if request_id else str(uuid.uuid4()),
+                )
             
             try:
-                response = await call_next(request)
+                with _TRACER.start_as_current_span("request_processing") as processing_span:
+                    processing_recording = processing_span.is_recording()
+                    if processing_recording:
+                        processing_span.set_attribute("stage", "middleware")
+                        # Request metadata lives on this span rather than a separate parsing span
+                        processing_span.set_attribute("parsing.content_type", content_type.decode("latin-1"))
+                        processing_span.set_attribute("parsing.content_length", content_length.decode("latin-1"))
+                        
+                        # Check if this is a JSON request
+                        if b"application/json" in content_type:
+                            processing_span.set_attribute("parsing.request_format", "json")
+                    
+                    process_start_ns = time.perf_counter_ns()
+                    
+                    try:
+                        # Process the request
+                        response = await call_next(request)
+                    except Exception as e:
+                        if processing_recording:
+                            processing_span.set_attribute("processing.duration_ms", (time.perf_counter_ns() - process_start_ns) // 1_000_000)
+                            processing_span.set_attribute("processing.status", "error")
+                            processing_span.set_attribute("error.type", type(e).__name__)
+                            processing_span.set_attribute("error.message", str(e))
+                        raise
+                    
+                    if processing_recording:
+                        processing_span.set_attribute("processing.duration_ms", (time.perf_counter_ns() - process_start_ns) // 1_000_000)
+                        processing_span.set_attribute("processing.status", "success")
                 
-                process_duration = time.time() - process_start
-                processing_span.set_attribute("processing.duration_ms", process_duration * 1000)
-                processing_span.set_attribute("processing.status", "success")
+                if recording:
+                    # Set response attributes
+                    span.set_attribute(_HTTP_STATUS_CODE, response.status_code)
+                    span.set_attribute(_HTTP_RESPONSE_SIZE, 
+                                     response.headers.get("content-length", "unknown"))
+                    
+                    # Set span status based on HTTP status
+                    if response.status_code >= 400:
+                        span.set_status(trace.Status(trace.StatusCode.ERROR))
+                    else:
+                        span.set_status(trace.Status(trace.StatusCode.OK))
                 
                 return response
                 
             except Exception as e:
-                process_duration = time.time() - process_start
-                processing_span.set_attribute("processing.duration_ms", process_duration * 1000)
-                processing_span.set_attribute("processing.status", "error")
-                processing_span.set_attribute("error.type", type(e).__name__)
-                processing_span.set_attribute("error.message", str(e))
+                if recording:
+                    # Record exception in span
+                    span.record_exception(e)
+                    span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
                 raise
+            
+            finally:
+                if recording:
+                    # Record request duration
+                    duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                    span.set_attribute(_HTTP_DURATION_MS, duration_ms)
 
 
 @asynccontextmanager
@@ -287,33 +322,41 @@ async def traced_operation(operation_name: str, **attributes):
     Context manager for tracing individual operations with proper error handling.
     Use this to wrap database calls, external API calls, etc.
     """
-    tracer = trace.get_tracer(__name__)
-    
-    with tracer.start_as_current_span(operation_name) as span:
-        # Set provided attributes
-        for key, value in attributes.items():
-            span.set_attribute(key, str(value))
+    with _TRACER.start_as_current_span(operation_name) as span:
+        recording = span.is_recording()
+        if recording and attributes:
+            # Set provided attributes in one call; primitives pass through unconverted
+            span.set_attributes({
+                key: value if isinstance(value, (str, bool, int, float)) else str(value)
+                for key, value in attributes.items()
+            })
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             yield span
             
-            # Mark as successful
-            duration = time.time() - start_time
-            span.set_attribute("operation.duration_ms", duration * 1000)
-            span.set_attribute("operation.status", "success")
-            span.set_status(trace.Status(trace.StatusCode.OK))
+            if recording:
+                # Mark as successful
+                duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                span.set_attributes({
+                    "operation.duration_ms": duration_ms,
+                    "operation.status": "success",
+                })
+                span.set_status(trace.Status(trace.StatusCode.OK))
             
         except Exception as e:
-            # Record the error
-            duration = time.time() - start_time
-            span.set_attribute("operation.duration_ms", duration * 1000)
-            span.set_attribute("operation.status", "error")
-            span.set_attribute("error.type", type(e).__name__)
-            span.set_attribute("error.message", str(e))
-            span.record_exception(e)
-            span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+            if recording:
+                # Record the error
+                duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                span.set_attributes({
+                    "operation.duration_ms": duration_ms,
+                    "operation.status": "error",
+                    "error.type": type(e).__name__,
+                    "error.message": str(e),
+                })
+                span.record_exception(e)
+                span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
             raise
 
 
@@ -330,35 +373,48 @@ async def trace_async_operations(*operations, operation_name: str = "parallel_op
         Results from all operations
     """
     import asyncio
-    tracer = trace.get_tracer(__name__)
-    
-    with tracer.start_as_current_span(operation_name) as parent_span:
+    with _TRACER.start_as_current_span(operation_name) as parent_span:
         parent_span.set_attribute("operations.count", len(operations))
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        
+        # Count failures as they happen instead of rescanning the results afterwards
+        error_count = 0
+        first_error = None
+        
+        async def capture(operation):
+            nonlocal error_count, first_error
+            try:
+                return await operation
+            except Exception as e:
+                error_count += 1
+                if first_error is None:
+                    first_error = e
+                return e
         
         try:
             # Run all operations in parallel
-            results = await asyncio.gather(*operations, return_exceptions=True)
+            results = await asyncio.gather(
+                *(capture(operation) for operation in operations), return_exceptions=True
+            )
             
-            duration = time.time() - start_time
-            parent_span.set_attribute("operations.duration_ms", duration * 1000)
+            duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            parent_span.set_attribute("operations.duration_ms", duration_ms)
             
             # Check for exceptions
-            exceptions = [r for r in results if isinstance(r, Exception)]
-            if exceptions:
-                parent_span.set_attribute("operations.errors", len(exceptions))
+            if error_count:
+                parent_span.set_attribute("operations.errors", error_count)
                 parent_span.set_attribute("operations.status", "partial_failure")
                 # Record first exception
-                parent_span.record_exception(exceptions[0])
+                parent_span.record_exception(first_error)
             else:
                 parent_span.set_attribute("operations.status", "success")
             
             return results
             
         except Exception as e:
-            duration = time.time() - start_time
-            parent_span.set_attribute("operations.duration_ms", duration * 1000)
+            duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            parent_span.set_attribute("operations.duration_ms", duration_ms)
             parent_span.set_attribute("operations.status", "failure")
             parent_span.record_exception(e)
             raise
@@ -381,11 +437,11 @@ setup_telemetry = setup_optimized_telemetry
 
 # Export utility functions
 __all__ = [
+    'TelemetryConfig',
     'setup_optimized_telemetry',
     'setup_telemetry',  # Alias for compatibility
     'get_telemetry',
     'traced_operation',
     'trace_async_operations',
-    'add_root_span_middleware',
-    'add_comprehensive_tracing_middleware'
+    'add_root_span_middleware'
 ]
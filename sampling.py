@@ -0,0 +1,75 @@
+"""
+Tail-based sampling.
+
+TailSampler holds every finished span of a trace until the trace's local root span
+ends, then forwards the whole trace to the wrapped processor (normally a
+BatchSpanProcessor) only if some span errored or ran longer than the latency
+threshold. Fast, successful traces are dropped before any serialization or export.
+"""
+import threading
+from typing import Optional
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.trace import StatusCode
+
+
+class TailSampler(SpanProcessor):
+    """Span processor that only forwards error or slow traces to its delegate."""
+
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        latency_threshold_ms: float = 500.0,
+        max_pending_traces: int = 10_000,
+    ):
+        self._delegate = delegate
+        self._threshold_ns = int(latency_threshold_ms * 1_000_000)
+        # Bounds memory for traces whose root never ends locally (oldest evicted first)
+        self._max_pending_traces = max_pending_traces
+        self._by_trace: dict[int, list[ReadableSpan]] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self._delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        # A local root has no parent in this process; its end completes the local trace
+        is_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            spans = self._by_trace.get(trace_id)
+            if spans is None:
+                if is_root:
+                    spans = [span]
+                else:
+                    if len(self._by_trace) >= self._max_pending_traces:
+                        del self._by_trace[next(iter(self._by_trace))]
+                    self._by_trace[trace_id] = [span]
+                    return
+            else:
+                spans.append(span)
+                if not is_root:
+                    return
+                del self._by_trace[trace_id]
+
+        if self._keep(spans):
+            for finished in spans:
+                self._delegate.on_end(finished)
+
+    def _keep(self, spans: list[ReadableSpan]) -> bool:
+        threshold_ns = self._threshold_ns
+        for span in spans:
+            if span.status.status_code is StatusCode.ERROR:
+                return True
+            if span.end_time - span.start_time > threshold_ns:
+                return True
+        return False
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._by_trace.clear()
+        self._delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._delegate.force_flush(timeout_millis)
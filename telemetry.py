@@ -1,17 +1,83 @@
 # c:\Users\tyriq\Documents\Github\lead_ignite_backend_3.0\backend\app\core\telemetry\telemetry.py
+import atexit
+import logging
 import os
+import secrets
+import signal
+import threading
 from typing import Optional
 
 from fastapi import APIRouter, FastAPI
+from opentelemetry import metrics, trace
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 
 from .client import TelemetryClient
+from .config import (
+    OTEL_BSP_EXPORT_TIMEOUT,
+    OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+    OTEL_BSP_MAX_QUEUE_SIZE,
+    OTEL_BSP_SCHEDULE_DELAY,
+    OTEL_EXPORTER_CONNECTION_POOL_SIZE,
+    OTEL_EXPORT_RETRY_DEADLINE_SEC,
+)
 from .decorators import measure_performance, trace_function, track_errors
-from .health_check import health_response
+from .exporters import (
+    PooledMetricExporter,
+    PooledSpanExporter,
+    RetryingSpanExporter,
+    configure_grafana_exporters,
+    keepalive_channel,
+    share_grpc_channel,
+    use_grpc_channel,
+)
+from .health_check import cached_health_response
+from .sampling import TailSampler
+
+logger = logging.getLogger(__name__)
 
 # Initialize at module level for easy access
 telemetry_client: Optional[TelemetryClient] = None
+# Serializes first-time setup so concurrent callers never build two providers
+_init_lock = threading.Lock()
+# Bound at setup so hot paths skip get_telemetry(); proxies until then
+_tracer: trace.Tracer = trace.get_tracer(__name__)
+_meter: metrics.Meter = metrics.get_meter(__name__)
+
+# Environment is read once at import; setup_telemetry only references these constants
+_ENV = os.environ.get
+_SERVICE_NAME = _ENV("SERVICE_NAME", "fastapi-connect-backend")
+_SERVICE_VERSION = _ENV("SERVICE_VERSION", "1.0.0")
+_ENVIRONMENT = _ENV("ENVIRONMENT", "production")
+_SAMPLING_RATIO = float(_ENV("OTEL_TRACES_SAMPLER_ARG", "1.0"))
+# Independent gRPC channels per exporter (falls back to OTEL_EXPORTER_CONNECTION_POOL_SIZE)
+_POOL_SIZE = int(_ENV("OTLP_CONNECTION_POOL_SIZE", OTEL_EXPORTER_CONNECTION_POOL_SIZE))
+_USE_MANAGED_SERVICES = _ENV("USE_MANAGED_SERVICES") == "true"
+_TEMPO_ENDPOINT = _ENV("TEMPO_EXPORTER_ENDPOINT")
+_TEMPO_TRACES_PATH = "/api/traces"
+_TEMPO_METRICS_PATH = _ENV("TEMPO_METRICS_PATH", "/api/push")
+_TEMPO_USERNAME = _ENV("TEMPO_USERNAME")
+_TEMPO_API_KEY = _ENV("TEMPO_API_KEY")
+_OTLP_COMPRESSION = _ENV("OTLP_COMPRESSION", "gzip")
+# "http" exports OTLP/protobuf over a keep-alive requests.Session instead of gRPC
+_OTLP_TRANSPORT = _ENV("OTLP_TRANSPORT", "grpc").lower()
+_LOCAL_ENDPOINT = _ENV("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
+_ENABLE_PROMETHEUS = _ENV("ENABLE_PROMETHEUS", "true").lower() == "true"
+# Routes the FastAPI instrumentation skips (no spans for probes, scrapes and docs)
+_FASTAPI_EXCLUDED_URLS = _ENV("OTEL_PYTHON_FASTAPI_EXCLUDED_URLS", "health,metrics,docs,openapi.json")
+# "minimal" records only a request counter (no latency/size histograms) and skips health/metrics routes
+_PROM_PROFILE = _ENV("PROM_PROFILE", "full").lower()
+_BSP_MAX_QUEUE_SIZE = int(_ENV("OTEL_BSP_MAX_QUEUE_SIZE", OTEL_BSP_MAX_QUEUE_SIZE))
+_BSP_MAX_EXPORT_BATCH_SIZE = int(_ENV("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", OTEL_BSP_MAX_EXPORT_BATCH_SIZE))
+_BSP_SCHEDULE_DELAY = int(_ENV("OTEL_BSP_SCHEDULE_DELAY", OTEL_BSP_SCHEDULE_DELAY))
+_BSP_EXPORT_TIMEOUT = int(_ENV("OTEL_BSP_EXPORT_TIMEOUT", OTEL_BSP_EXPORT_TIMEOUT))
+# Overall retry budget per failed span batch (each attempt is bounded by the exporter timeout)
+_EXPORT_RETRY_DEADLINE = float(_ENV("OTEL_EXPORT_RETRY_DEADLINE_SEC", OTEL_EXPORT_RETRY_DEADLINE_SEC))
+# Opt-in tail sampling: export only traces with an error or a span slower than the threshold
+_TAIL_SAMPLING = _ENV("OTEL_TAIL_SAMPLING", "false").lower() == "true"
+_TAIL_SAMPLING_LATENCY_MS = float(_ENV("OTEL_TAIL_SAMPLING_LATENCY_MS", "500"))
 
 
 def setup_telemetry(app: FastAPI) -> TelemetryClient:
@@ -23,115 +89,148 @@ def setup_telemetry(app: FastAPI) -> TelemetryClient:
         app: FastAPI application instance
 
     Returns:
-        Configured TelemetryClient instance
+        Configured TelemetryClient instance; later calls return the existing one
     """
-    global telemetry_client
+    if telemetry_client is not None:
+        return telemetry_client
+    with _init_lock:
+        # Another caller may have finished setup while we waited on the lock
+        if telemetry_client is not None:
+            return telemetry_client
+        return _setup_telemetry(app)
+
+
+def _setup_telemetry(app: FastAPI) -> TelemetryClient:
+    """Build, configure and publish the telemetry client (caller holds _init_lock)."""
+    global telemetry_client, _tracer, _meter
 
     # Get service configuration with explicit defaults
-    service_name = os.getenv("SERVICE_NAME", "fastapi-connect-backend")
-    service_version = os.getenv("SERVICE_VERSION", "1.0.0")
-    environment = os.getenv("ENVIRONMENT", "production")
+    service_name = _SERVICE_NAME
+    service_version = _SERVICE_VERSION
+    environment = _ENVIRONMENT
     
     # Create unique instance ID for better tracing
-    import uuid
-    instance_id = f"{service_name}-{uuid.uuid4().hex[:8]}"
+    instance_id = f"{service_name}-{secrets.token_hex(4)}"
     
-    print(f"[TELEMETRY] Initializing telemetry for {service_name} (instance: {instance_id})")
+    logger.info("Initializing telemetry for %s (instance: %s)", service_name, instance_id)
+
+    # Head sampling: record this fraction of new traces, follow the parent's decision otherwise
+    sampler = ParentBased(TraceIdRatioBased(_SAMPLING_RATIO))
 
     # Initialize OpenTelemetry client with explicit configuration
-    telemetry_client = TelemetryClient(
+    # Built in a local and published last, so the lock-free fast path in setup_telemetry()
+    # never returns a half-configured client and a failed setup leaves the global None
+    client = TelemetryClient(
         service_name=service_name,
         service_version=service_version,
         auto_init=False,  # We'll configure exporters manually
         instance_id=instance_id,
-        environment=environment
+        environment=environment,
+        sampler=sampler,
+        connection_pool_size=_POOL_SIZE,
     )
+    pool_size = _POOL_SIZE
 
     # Configure OTLP exporter for Grafana Cloud Tempo
-    if os.getenv("USE_MANAGED_SERVICES") == "true":
-        print("[INFO] Configuring Grafana Cloud Tempo integration", flush=True)
+    if _USE_MANAGED_SERVICES:
+        logger.info("Configuring Grafana Cloud Tempo integration")
         # Grafana Cloud configuration
-        otlp_endpoint = os.getenv("TEMPO_EXPORTER_ENDPOINT")
-        tempo_username = os.getenv("TEMPO_USERNAME")  
-        tempo_api_key = os.getenv("TEMPO_API_KEY")
-        
-        print(f"[DEBUG] TEMPO_EXPORTER_ENDPOINT: {otlp_endpoint}", flush=True)
-        print(f"[DEBUG] TEMPO_USERNAME: {tempo_username}", flush=True)
-        print(f"[DEBUG] TEMPO_API_KEY: {'✓' if tempo_api_key else '✗'}", flush=True)
-        
-        if not otlp_endpoint or not tempo_username or not tempo_api_key:
-            print("[WARNING] Grafana Cloud credentials not properly configured", flush=True)
-            print("  TEMPO_EXPORTER_ENDPOINT:", "✓" if otlp_endpoint else "✗")
-            print("  TEMPO_USERNAME:", "✓" if tempo_username else "✗")
-            print("  TEMPO_API_KEY:", "✓" if tempo_api_key else "✗")
+        otlp_endpoint = _TEMPO_ENDPOINT
+        tempo_username = _TEMPO_USERNAME
+        tempo_api_key = _TEMPO_API_KEY
         
-        # Use basic authentication for Grafana Cloud Tempo (gRPC metadata format)
-        import base64
-        credentials = f"{tempo_username}:{tempo_api_key}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        # gRPC uses metadata, not headers - and expects key-value tuples
-        headers = (
-            ("authorization", f"Basic {encoded_credentials}"),
-        )
-        
-        span_exporter = OTLPSpanExporter(
-            endpoint=otlp_endpoint,
-            headers=headers,
-            timeout=2,  # Reduced from 30s to 2s for faster failure
-            insecure=False  # Use secure connection for Grafana Cloud
+        logger.debug(
+            "TEMPO_EXPORTER_ENDPOINT=%s TEMPO_USERNAME=%s TEMPO_API_KEY set=%s",
+            otlp_endpoint, tempo_username, bool(tempo_api_key),
         )
         
-        # Also configure metrics exporter for Grafana Cloud
-        metrics_endpoint = otlp_endpoint.replace("/api/traces", "/api/push")
-        print(f"[DEBUG] Metrics endpoint: {metrics_endpoint}", flush=True)
-        metric_exporter = OTLPMetricExporter(
-            endpoint=metrics_endpoint,
-            headers=headers,
-            timeout=2,  # Reduced from 30s to 2s for faster failure
-            insecure=False  # Use secure connection for Grafana Cloud
+        span_exporter, metric_exporter = configure_grafana_exporters(
+            otlp_endpoint, tempo_username, tempo_api_key, pool_size, client.circuit_breakers,
+            transport=_OTLP_TRANSPORT,
+            compression=_OTLP_COMPRESSION,
+            traces_path=_TEMPO_TRACES_PATH,
+            metrics_path=_TEMPO_METRICS_PATH,
+            retry_deadline=_EXPORT_RETRY_DEADLINE,
         )
-        
-        print("[INFO] Grafana Cloud exporters configured with Basic Auth", flush=True)
+        logger.info("Grafana Cloud exporters configured with Basic Auth")
     else:
-        print("[INFO] Using local Tempo setup", flush=True)
+        logger.info("Using local Tempo setup")
         # Local Tempo setup with reduced timeouts
-        local_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
-        span_exporter = OTLPSpanExporter(endpoint=local_endpoint, timeout=2)
-        metric_exporter = OTLPMetricExporter(endpoint=local_endpoint, timeout=2)
+        local_endpoint = _LOCAL_ENDPOINT
+        local_insecure = not local_endpoint.startswith("https://")
+        span_exporter = PooledSpanExporter(
+            lambda: RetryingSpanExporter(
+                use_grpc_channel(
+                    OTLPSpanExporter(endpoint=local_endpoint, timeout=2),
+                    keepalive_channel(local_endpoint, insecure=local_insecure),
+                ),
+                attempt_timeout=2,
+                deadline=_EXPORT_RETRY_DEADLINE,
+            ),
+            pool_size,
+            client.circuit_breakers["traces"],
+        )
+        metric_exporter = PooledMetricExporter(
+            lambda: use_grpc_channel(
+                OTLPMetricExporter(endpoint=local_endpoint, timeout=2),
+                keepalive_channel(local_endpoint, insecure=local_insecure),
+            ),
+            pool_size,
+            client.circuit_breakers["metrics"],
+        )
     
+    # Batch spans so requests never wait on an export round-trip; tunable per deployment
+    span_processor = BatchSpanProcessor(
+        span_exporter,
+        max_queue_size=_BSP_MAX_QUEUE_SIZE,
+        max_export_batch_size=_BSP_MAX_EXPORT_BATCH_SIZE,
+        schedule_delay_millis=_BSP_SCHEDULE_DELAY,
+        export_timeout_millis=_BSP_EXPORT_TIMEOUT,
+    )
+    if _TAIL_SAMPLING:
+        # Decide per finished trace before anything reaches the batch queue
+        span_processor = TailSampler(span_processor, latency_threshold_ms=_TAIL_SAMPLING_LATENCY_MS)
+
     # Configure telemetry client with the exporters
-    telemetry_client.configure_exporters(span_exporter, metric_exporter)
+    client.configure_exporters(span_exporter, metric_exporter, span_processor=span_processor)
     
     # Instrument FastAPI with OpenTelemetry
-    telemetry_client.instrument_fastapi(app)
+    client.instrument_fastapi(app, excluded_urls=_FASTAPI_EXCLUDED_URLS)
     
     # Add Prometheus instrumentation if enabled (will use same prometheus_client)
-    if os.getenv("ENABLE_PROMETHEUS", "true").lower() == "true":
+    # app.state flag keeps repeated setup (tests, reload) from mounting /metrics twice
+    if _ENABLE_PROMETHEUS and not getattr(app.state, "_prom_exposed", False):
         try:
-            from prometheus_fastapi_instrumentator import Instrumentator
+            # Aliased: a bare `metrics` would shadow the OpenTelemetry module for this whole function
+            from prometheus_fastapi_instrumentator import Instrumentator, metrics as prom_metrics
+            
+            minimal = _PROM_PROFILE == "minimal"
             
             # Create instrumentator with custom metrics
             instrumentator = Instrumentator(
                 should_group_status_codes=True,
-                should_ignore_untemplated=True
+                should_ignore_untemplated=True,
+                excluded_handlers=["/health.*", "/metrics"] if minimal else [],
             )
             
-            # Add default metrics
+            if minimal:
+                # Histograms are the costliest default collectors; count requests only
+                instrumentator.add(prom_metrics.requests())
+            
+            # Add default metrics (skipped by the instrumentator once any metric was added)
             instrumentator.instrument(app)
             
-            # Keep existing prometheus-client metrics
-            @app.on_event("startup")
-            async def expose_metrics():
-                instrumentator.expose(app)
+            # Keep existing prometheus-client metrics; mounted now rather than in a startup hook
+            instrumentator.expose(app, include_in_schema=False, endpoint="/metrics")
+            app.state._prom_exposed = True
         except ImportError:
-            print("[WARNING] prometheus_fastapi_instrumentator not available", flush=True)
+            logger.warning("prometheus_fastapi_instrumentator not available")
     
     # Register health check endpoint
     health_router = APIRouter()
     health_router.add_api_route(
         "/health/telemetry",
-        health_response,
+        cached_health_response,
         methods=["GET"],
         tags=["monitoring"],
         summary="Telemetry system health",
@@ -139,7 +238,37 @@ def setup_telemetry(app: FastAPI) -> TelemetryClient:
     )
     app.include_router(health_router)
 
-    return telemetry_client
+    # Drain the span queue on rolling deploys instead of dropping it
+    _install_sigterm_handler()
+
+    _tracer = client.get_tracer()
+    _meter = metrics.get_meter(service_name, service_version)
+
+    telemetry_client = client
+    return client
+
+
+def _install_sigterm_handler() -> None:
+    """Flush telemetry on SIGTERM, then defer to whatever handler was installed before."""
+    try:
+        previous = signal.getsignal(signal.SIGTERM)
+    except (AttributeError, ValueError):
+        return  # No SIGTERM on this platform
+
+    def _on_sigterm(signum, frame):
+        shutdown_telemetry()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            # Re-deliver so the process still terminates as it would have
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    try:
+        signal.signal(signal.SIGTERM, _on_sigterm)
+    except ValueError:
+        # signal() only works in the main thread; atexit still flushes on normal exit
+        logger.debug("Not in main thread; SIGTERM telemetry flush not installed")
 
 
 def get_telemetry() -> TelemetryClient:
@@ -154,11 +283,27 @@ def get_telemetry() -> TelemetryClient:
     return telemetry_client
 
 
+def get_tracer() -> trace.Tracer:
+    """Tracer bound by setup_telemetry(); no client lookup or None check per call."""
+    return _tracer
+
+
+def get_meter() -> metrics.Meter:
+    """Meter bound by setup_telemetry(); no client lookup or None check per call."""
+    return _meter
+
+
 @trace_function("shutdown_telemetry", attributes={"component": "telemetry"})
 def shutdown_telemetry():
-    """Properly shutdown telemetry providers."""
+    """Properly shutdown telemetry providers (safe to call more than once)."""
+    global telemetry_client
     if telemetry_client is not None:
-        telemetry_client.shutdown()
+        client, telemetry_client = telemetry_client, None
+        client.shutdown()
+
+
+# Flush buffered spans on interpreter exit
+atexit.register(shutdown_telemetry)
 
 
 instrument = trace_function